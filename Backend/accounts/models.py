@@ -61,6 +61,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     # Add this field for OAuth users
     is_profile_complete = models.BooleanField(default=False)
 
+    # Last profile change; validator for conditional GETs (swapo/conditional.py)
+    updated_at = models.DateTimeField(auto_now=True)
+
     @property
     def id(self):
         return self.user_id
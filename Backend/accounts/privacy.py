@@ -0,0 +1,129 @@
+"""
+Privacy checks on the hot paths: who may message or propose a trade to a
+user (UserPrivacy.contact_option) and who may see a private profile or
+skill list (public_profile / public_skills).
+
+"People with mutual skills" means the two users share at least one skill
+(offered or desired). Rather than joining UserSkill on every message send,
+each user's skill_ids are cached as a sorted tuple, so the test is an
+intersection of two cached values whose size follows the number of skills
+the users have, not the largest skill_id. Privacy settings are cached the
+same way. Both are invalidated by signals
+(signals.py) and expire after ``CONTACT_POLICY_CACHE_TIMEOUT`` seconds,
+which bounds staleness on caches that are not shared between workers.
+
+A private profile or skill list stays visible to its owner and to users
+with mutual skills.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from userSkills.models import UserSkill
+from .models import UserPrivacy
+
+EVERYONE = "Everyone"
+MUTUAL_SKILLS = "People with mutual skills"
+NO_ONE = "No one"
+
+# Defaults of UserPrivacy for users who never saved their settings
+DEFAULT_POLICY = {"public_profile": True, "public_skills": True, "contact_option": EVERYONE}
+
+
+def skill_set_key(user_id):
+    return f"privacy:skill-ids:{user_id}"
+
+
+def policy_key(user_id):
+    return f"privacy:policy:{user_id}"
+
+
+def timeout():
+    return getattr(settings, "CONTACT_POLICY_CACHE_TIMEOUT", 300)
+
+
+def skill_sets(user_ids):
+    """user_id -> sorted tuple of the user's skill_ids, from the cache, loading the missing ones in one query."""
+    keys = {skill_set_key(user_id): user_id for user_id in user_ids}
+    cached = cache.get_many(list(keys))
+    sets = {keys[key]: skill_ids for key, skill_ids in cached.items()}
+    missing = [user_id for user_id in user_ids if user_id not in sets]
+    if missing:
+        loaded = {user_id: set() for user_id in missing}
+        for user_id, skill_id in UserSkill.objects.filter(user_id__in=missing).values_list("user_id", "skill_id"):
+            loaded[user_id].add(skill_id)
+        loaded = {user_id: tuple(sorted(skill_ids)) for user_id, skill_ids in loaded.items()}
+        cache.set_many({skill_set_key(user_id): skill_ids for user_id, skill_ids in loaded.items()}, timeout())
+        sets.update(loaded)
+    return sets
+
+
+def policy(user_id):
+    """The user's privacy settings as a dict of DEFAULT_POLICY's keys."""
+    cached = cache.get(policy_key(user_id))
+    if cached is None:
+        row = UserPrivacy.objects.filter(user_id=user_id).values(*DEFAULT_POLICY).first()
+        cached = row or DEFAULT_POLICY
+        cache.set(policy_key(user_id), cached, timeout())
+    return cached
+
+
+def have_mutual_skills(user_id, other_id):
+    sets = skill_sets([user_id, other_id])
+    return not set(sets[user_id]).isdisjoint(sets[other_id])
+
+
+def can_contact(sender_id, recipient_id):
+    """Whether ``sender_id`` may message or propose a trade to ``recipient_id``."""
+    if sender_id == recipient_id:
+        return True
+    option = policy(recipient_id)["contact_option"]
+    if option == NO_ONE:
+        return False
+    if option == MUTUAL_SKILLS:
+        return have_mutual_skills(sender_id, recipient_id)
+    return True
+
+
+def contact_refusal(recipient_id):
+    """The reason given when can_contact refuses."""
+    if policy(recipient_id)["contact_option"] == NO_ONE:
+        return "This user does not accept contact requests."
+    return "This user only accepts contact from people with mutual skills."
+
+
+def can_view(viewer, owner_id, setting):
+    """Whether ``viewer`` (possibly anonymous) may see what ``setting`` ("public_profile"/"public_skills") covers."""
+    if policy(owner_id)[setting]:
+        return True
+    if not viewer.is_authenticated:
+        return False
+    return viewer.user_id == owner_id or have_mutual_skills(viewer.user_id, owner_id)
+
+
+def visible_to_viewer(setting):
+    """
+    Guard a view method taking ``user_id`` with can_view. Apply it outside
+    ``conditional``/``single_flight``: their cached bodies are shared by
+    everyone allowed to see them, so the check has to come first.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not can_view(request.user, int(kwargs["user_id"]), setting):
+                return Response({"detail": "This user's information is private."}, status=status.HTTP_403_FORBIDDEN)
+            return method(view, request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def forget_skill_set(user_id):
+    transaction.on_commit(lambda: cache.delete(skill_set_key(user_id)))
+
+
+def forget_policy(user_id):
+    transaction.on_commit(lambda: cache.delete(policy_key(user_id)))
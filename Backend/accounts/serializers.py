@@ -3,7 +3,7 @@ from django.contrib.auth import authenticate
 from .models import User
 from rest_framework import serializers
 from django.contrib.auth import password_validation
-from cloudinary.uploader import upload as cloudinary_upload
+from listings.uploads import upload_file
 
 from rest_framework import serializers
 from django.contrib.auth import authenticate
@@ -166,8 +166,7 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
         image = validated_data.pop("profile_picture_url", None)
 
         if image:
-            upload_result = cloudinary_upload(image)
-            instance.profile_picture_url = upload_result.get("secure_url")
+            instance.profile_picture_url = upload_file(image)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from userSkills.models import UserSkill
+from .models import UserPrivacy
+from . import privacy
+
+
+@receiver(post_save, sender=UserSkill)
+@receiver(post_delete, sender=UserSkill)
+def forget_skill_set(sender, instance, **kwargs):
+    privacy.forget_skill_set(instance.user_id)
+
+
+@receiver(post_save, sender=UserPrivacy)
+@receiver(post_delete, sender=UserPrivacy)
+def forget_privacy_policy(sender, instance, **kwargs):
+    privacy.forget_policy(instance.user_id)
@@ -18,10 +18,15 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from urllib.parse import urlencode
 from rest_framework.parsers import MultiPartParser, FormParser
 import logging
-from cloudinary.uploader import upload as cloudinary_upload
 
 from listings.models import PortfolioImage
 from listings.serializers import UserPortfolioImageSerializer
+from listings.uploads import prepare_images, queue_portfolio_images
+from listings.models import SkillListing
+from django.db.models import Count, Max
+from swapo.conditional import conditional
+from swapo.singleflight import single_flight
+from .privacy import visible_to_viewer
 
 
 logger = logging.getLogger(__name__)
@@ -332,6 +337,20 @@ class DeleteAccountView(generics.GenericAPIView):
             status=status.HTTP_204_NO_CONTENT,
         )
     
+def profile_validators(view, request, user_id):
+    """Validators of a public profile (ETag only): the user and privacy rows plus an aggregate over their listings"""
+    user = User.objects.filter(user_id=user_id).values_list("updated_at", "privacy__updated_at").first()
+    if user is None:
+        return None
+    listings = SkillListing.objects.filter(user_id=user_id).aggregate(
+        count=Count("listing_id"),
+        last_updated=Max("last_updated"),
+        skill_offered=Max("skill_offered__updated_at"),
+        skill_desired=Max("skill_desired__updated_at"),
+    )
+    return (user, listings), None
+
+
 class OtherUserProfileView(generics.RetrieveAPIView):
     """
     Fetch public info and listings for a given user.
@@ -344,6 +363,12 @@ class OtherUserProfileView(generics.RetrieveAPIView):
     lookup_field = 'user_id'       
     lookup_url_kwarg = 'user_id'
 
+    @visible_to_viewer("public_profile")
+    @conditional(profile_validators)
+    @single_flight("profile")
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 class UserPortfolioImagesView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -351,7 +376,7 @@ class UserPortfolioImagesView(APIView):
         """
         Return all portfolio images for the authenticated user.
         """
-        images = PortfolioImage.objects.filter(user=request.user, image_url__startswith="https://")
+        images = PortfolioImage.objects.filter(user=request.user, status=PortfolioImage.READY).exclude(image_url="")
         serializer = UserPortfolioImageSerializer(images, many=True)
         return Response({"portfolio_images": serializer.data}, status=status.HTTP_200_OK)
 
@@ -363,21 +388,11 @@ class UserPortfolioImagesView(APIView):
         if not files:
             return Response({"error": "No images provided."}, status=status.HTTP_400_BAD_REQUEST)
 
-        uploaded_images = []
-        for file in files:
-            # Upload to Cloudinary
-            result = cloudinary_upload(file)
-            image_url = result.get("secure_url")
-            if not image_url:
-                continue
-
-            # Create PortfolioImage entry
-            portfolio_image = PortfolioImage.objects.create(
-                user=request.user,
-                listing=None,  
-                image_url=image_url
-            )
-            uploaded_images.append(portfolio_image)
+        # Pending rows uploaded concurrently (listings/uploads.py); failed uploads are left out
+        uploaded_images = [
+            image for image in queue_portfolio_images(request.user, prepare_images(files))
+            if image.status != PortfolioImage.FAILED
+        ]
 
         serializer = UserPortfolioImageSerializer(uploaded_images, many=True)
         return Response({"portfolio_images": serializer.data}, status=status.HTTP_201_CREATED)
@@ -0,0 +1,139 @@
+"""
+Bulk import and export of skill listings.
+
+Import validates every row without touching the database, resolves all
+referenced skill names in one query, creates the missing skills with a
+single bulk_create and inserts the valid listings in batches inside one
+transaction. Invalid rows are reported by their index and skipped.
+
+Export streams a user's listings as NDJSON in the same row format, so an
+export can be imported again. aexport_listings is the same stream for
+ASGI servers, which buffer a sync iterator whole.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework import serializers
+
+from skills.models import Skill
+from .models import SkillListing
+from .parsers import InvalidLine
+from .search import get_search_backend
+from . import facets, feed_cache
+
+
+MAX_ROWS = 1000
+BATCH_SIZE = 500
+
+EXPORT_FIELDS = (
+    "listing_id", "title", "description", "status", "location_preference", "portfolio_link",
+    "creation_date", "last_updated",
+)
+
+
+class ListingRowSerializer(serializers.ModelSerializer):
+    # Skills are referenced by name and resolved for the whole batch at once
+    skill_offered = serializers.CharField(max_length=100)
+    skill_desired = serializers.CharField(max_length=100)
+
+    class Meta:
+        model = SkillListing
+        fields = ["title", "description", "skill_offered", "skill_desired", "status", "location_preference", "portfolio_link"]
+
+
+def resolve_skills(names):
+    """
+    Map lower-cased skill name -> Skill, matching existing skills
+    case-insensitively and creating the missing ones.
+    """
+    by_lower = {name.lower(): name for name in names}
+
+    def existing(lower_names):
+        return {
+            skill.skill_name.lower(): skill
+            for skill in Skill.objects.annotate(name_lower=Lower("skill_name")).filter(name_lower__in=lower_names)
+        }
+
+    skills = existing(list(by_lower))
+    missing = [name for lower, name in by_lower.items() if lower not in skills]
+    if missing:
+        # Custom skills start without a category, like the ones created by SkillListingView.post
+        Skill.objects.bulk_create([Skill(skill_name=name, category="") for name in missing], ignore_conflicts=True)
+        skills.update(existing([name.lower() for name in missing]))
+    return skills
+
+
+def import_listings(user, rows):
+    """Create ``user``'s listings from ``rows``; returns (created listings, per-row errors)."""
+    errors = []
+    valid = []
+    for index, row in enumerate(rows):
+        if isinstance(row, InvalidLine):
+            errors.append({"row": index, "errors": {"non_field_errors": [row.message]}})
+            continue
+        if not isinstance(row, dict):
+            errors.append({"row": index, "errors": {"non_field_errors": ["Each row must be a JSON object."]}})
+            continue
+        serializer = ListingRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors.append({"row": index, "errors": serializer.errors})
+
+    if not valid:
+        return [], errors
+
+    with transaction.atomic():
+        skills = resolve_skills({data[field] for data in valid for field in ("skill_offered", "skill_desired")})
+        listings = SkillListing.objects.bulk_create(
+            [
+                SkillListing(
+                    user=user,
+                    **{
+                        **data,
+                        "skill_offered": skills[data["skill_offered"].lower()],
+                        "skill_desired": skills[data["skill_desired"].lower()],
+                    },
+                )
+                for data in valid
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        # bulk_create sends no signals: index, count and invalidate here
+        listing_ids = [listing.listing_id for listing in listings]
+        backend = get_search_backend()
+        for start in range(0, len(listing_ids), BATCH_SIZE):
+            backend.index(listing_ids[start:start + BATCH_SIZE])
+        facets.add_listings(facets.values_of(listing) for listing in listings)
+        feed_cache.invalidate()
+
+    return listings, errors
+
+
+def _export_rows(user):
+    return (
+        SkillListing.objects.filter(user=user)
+        .order_by("listing_id")
+        .values(*EXPORT_FIELDS, "skill_offered__skill_name", "skill_desired__skill_name")
+    )
+
+
+def _export_line(row):
+    row["skill_offered"] = row.pop("skill_offered__skill_name")
+    row["skill_desired"] = row.pop("skill_desired__skill_name")
+    return json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+
+def export_listings(user):
+    """Yield ``user``'s listings as NDJSON lines, oldest first, reading the table in chunks."""
+    for row in _export_rows(user).iterator(chunk_size=BATCH_SIZE):
+        yield _export_line(row)
+
+
+async def aexport_listings(user):
+    """Async counterpart of export_listings, for StreamingHttpResponse under ASGI."""
+    async for row in _export_rows(user).aiterator(chunk_size=BATCH_SIZE):
+        yield _export_line(row)
@@ -0,0 +1,143 @@
+"""
+Facets for the public listings feed.
+
+Each listing contributes one value to every facet below. Counts live in
+ListingFacetCount and are adjusted by the listing signals with the
+difference between a listing's facet values before and after a change.
+``status`` counts every listing; the other facets count active listings,
+i.e. what the public feed can show. Filtering by a status other than
+active lists the requester's own listings only.
+"""
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from rest_framework.exceptions import NotAuthenticated, ValidationError
+
+from skills.models import Skill
+from .models import SkillListing, ListingFacetCount
+
+
+# facet name -> listing lookup used both to read a listing's value and to filter the feed
+FACETS = {
+  "skill_offered": "skill_offered_id",
+  "skill_desired": "skill_desired_id",
+  "category": "skill_offered__category",
+  "status": "status",
+  "location": "location_preference",
+}
+SKILL_FACETS = ("skill_offered", "skill_desired")
+
+
+def facet_values(row):
+  """(facet, value) pairs a listing counts towards; ``row`` maps FACETS lookups to values."""
+  if row is None:
+    return []
+  pairs = [("status", row["status"])]
+  if row["status"] == "active":
+    for facet, lookup in FACETS.items():
+      if facet != "status" and row[lookup] not in (None, ""):
+        pairs.append((facet, str(row[lookup])))
+  return pairs
+
+
+def current_values(listing_id):
+  return SkillListing.objects.filter(listing_id=listing_id).values(*FACETS.values()).first()
+
+
+def values_of(listing):
+  """Facet row for an in-memory listing (reads the offered skill's category)."""
+  return {
+    "skill_offered_id": listing.skill_offered_id,
+    "skill_desired_id": listing.skill_desired_id,
+    "skill_offered__category": listing.skill_offered.category,
+    "status": listing.status,
+    "location_preference": listing.location_preference,
+  }
+
+
+def adjust(before, after):
+  """Move the listing's contribution from the ``before`` row to the ``after`` row."""
+  deltas = Counter(facet_values(after))
+  deltas.subtract(Counter(facet_values(before)))
+  for (facet, value), delta in deltas.items():
+    if delta:
+      increment(facet, value, delta)
+
+
+def add_listings(rows):
+  """Count bulk-created listings (rows as in ``facet_values``) with one update per facet value."""
+  deltas = Counter()
+  for row in rows:
+    deltas.update(facet_values(row))
+  for (facet, value), delta in deltas.items():
+    increment(facet, value, delta)
+
+
+def increment(facet, value, delta):
+  updated = ListingFacetCount.objects.filter(facet=facet, value=value).update(count=F("count") + delta)
+  if updated:
+    return
+  try:
+    with transaction.atomic():
+      ListingFacetCount.objects.create(facet=facet, value=value, count=max(delta, 0))
+  except IntegrityError:
+    # Created concurrently; apply the delta to that row instead
+    ListingFacetCount.objects.filter(facet=facet, value=value).update(count=F("count") + delta)
+
+
+def rebuild(names=None):
+  """Recompute the counts of the given facets (all by default) from the listings table."""
+  names = list(names or FACETS)
+  rows = []
+  for facet in names:
+    lookup = FACETS[facet]
+    listings = SkillListing.objects.all() if facet == "status" else SkillListing.objects.filter(status="active")
+    listings = listings.exclude(**{f"{lookup}__isnull": True})
+    if facet not in SKILL_FACETS:
+      listings = listings.exclude(**{lookup: ""})
+    for value, count in listings.values_list(lookup).annotate(count=Count("listing_id")).order_by():
+      rows.append(ListingFacetCount(facet=facet, value=str(value), count=count))
+
+  with transaction.atomic():
+    ListingFacetCount.objects.filter(facet__in=names).delete()
+    ListingFacetCount.objects.bulk_create(rows, batch_size=1000)
+  return len(rows)
+
+
+def get_facet_counts():
+  """{facet: [{"value", "label", "count"}]} ordered by count, with skill names as labels."""
+  rows = list(ListingFacetCount.objects.filter(count__gt=0).order_by("facet", "-count", "value"))
+  skill_ids = {int(row.value) for row in rows if row.facet in SKILL_FACETS}
+  skill_names = dict(Skill.objects.filter(skill_id__in=skill_ids).values_list("skill_id", "skill_name"))
+
+  facets = {facet: [] for facet in FACETS}
+  for row in rows:
+    label = skill_names.get(int(row.value), row.value) if row.facet in SKILL_FACETS else row.value
+    facets[row.facet].append({"value": row.value, "label": label, "count": row.count})
+  return facets
+
+
+def owner_only(params):
+  """Whether the filters ask for non-active listings, which only their owner may list."""
+  return (params.get("status") or "active") != "active"
+
+
+def apply_filters(queryset, params, user=None):
+  """
+  Filter the feed by any facet given as a query parameter. Status defaults
+  to active; other statuses are restricted to ``user``'s own listings.
+  """
+  filters = {"status": params.get("status") or "active"}
+  if owner_only(params):
+    if user is None or not user.is_authenticated:
+      raise NotAuthenticated("Only active listings are public; sign in to filter your own listings by status.")
+    filters["user"] = user
+  for facet, lookup in FACETS.items():
+    value = params.get(facet)
+    if not value or facet == "status":
+      continue
+    if facet in SKILL_FACETS and not value.isdigit():
+      raise ValidationError({facet: "A valid skill id is required."})
+    filters[lookup] = value
+  return queryset.filter(**filters)
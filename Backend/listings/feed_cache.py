@@ -0,0 +1,116 @@
+"""
+Versioned response cache for the public listings feed and listing detail.
+
+Entries are keyed by a generation number kept in the cache itself. Any
+change to data the feed shows (listings, their images, skills and the
+public profile fields of users) bumps the generation once the transaction
+commits (see signals.py), so every older entry becomes unreachable at once
+and simply ages out: no key scans, and the same on LocMem and Redis.
+
+Entries go through singleflight.py: after a bump one worker rebuilds a
+page while concurrent requests keep getting the previous generation's body.
+Hits, stale hits and misses are counted in the cache as well; see `stats()`.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from swapo import singleflight
+from .models import SkillListing
+
+
+GENERATION_KEY = "listings:generation"
+COUNTER_KEYS = {
+    "hits": "listings:cache:hits",
+    "stale": "listings:cache:stale",
+    "misses": "listings:cache:misses",
+}
+
+
+def get_cache():
+    return caches[getattr(settings, "LISTING_CACHE_ALIAS", "default")]
+
+
+def generation():
+    cache = get_cache()
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # Seeded from the clock so an evicted counter never restarts at a value already used
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+def bump():
+    cache = get_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def invalidate():
+    """Retire every cached response once the current transaction commits."""
+    transaction.on_commit(bump)
+
+
+def touch_listings(listing_ids):
+    """
+    Bump last_updated of listings whose images changed (it validates
+    conditional GETs) and retire the cached responses.
+    """
+    listing_ids = {listing_id for listing_id in listing_ids if listing_id}
+    if listing_ids:
+        SkillListing.objects.filter(listing_id__in=listing_ids).update(last_updated=timezone.now())
+        invalidate()
+
+
+def count(counter):
+    cache = get_cache()
+    key = COUNTER_KEYS[counter]
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+def stats():
+    cache = get_cache()
+    hits = cache.get(COUNTER_KEYS["hits"], 0)
+    stale = cache.get(COUNTER_KEYS["stale"], 0)
+    misses = cache.get(COUNTER_KEYS["misses"], 0)
+    served = hits + stale + misses
+    return {
+        "hits": hits,
+        "stale": stale,
+        "misses": misses,
+        "hit_ratio": round((hits + stale) / served, 4) if served else None,
+        "generation": cache.get(GENERATION_KEY),
+    }
+
+
+def response_key(request):
+    path = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+    return f"listings:response:{path}"
+
+
+def cached_payload(request, build):
+    """
+    Return ``(payload, state)`` for the request (a singleflight state),
+    calling ``build()`` on a miss. Errors raised by ``build`` (404, invalid
+    filters) are never cached.
+    """
+    payload, state = singleflight.fetch(
+        response_key(request),
+        build,
+        version=generation(),
+        fresh=getattr(settings, "LISTING_CACHE_TIMEOUT", 300),
+        cache=get_cache(),
+    )
+    count({singleflight.STALE: "stale", singleflight.COMPUTED: "misses"}.get(state, "hits"))
+    return payload, state
@@ -0,0 +1,70 @@
+"""
+Local preprocessing of uploaded images before they reach the storage
+backend (uploads.py).
+
+Every image is decoded with Pillow, so anything that is not an image is
+rejected before it is spooled or uploaded. It is then rotated upright from
+its EXIF orientation, downscaled to ``IMAGE_MAX_DIMENSION`` and re-encoded
+as ``IMAGE_FORMAT`` at ``IMAGE_QUALITY``. Only the pixels and the colour
+profile are written back, so EXIF data (GPS position, camera serial, ...)
+is dropped.
+"""
+import io
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework.exceptions import ValidationError
+
+
+EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+
+def reject(file):
+    raise ValidationError({"images": f"{file.name or 'Upload'} is not a valid image."})
+
+
+def validate(file):
+    """Reject ``file`` unless Pillow recognises it; checks the structure without decoding pixels."""
+    try:
+        file.seek(0)
+        with Image.open(file) as image:
+            image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        reject(file)
+
+
+def preprocess(file):
+    """Return the resized, re-encoded and metadata-free copy of ``file`` as a ContentFile."""
+    max_dimension = getattr(settings, "IMAGE_MAX_DIMENSION", 2048)
+    image_format = getattr(settings, "IMAGE_FORMAT", "WEBP").upper()
+    quality = getattr(settings, "IMAGE_QUALITY", 82)
+
+    validate(file)
+    try:
+        file.seek(0)
+        with Image.open(file) as original:
+            # Decoding at a reduced scale keeps large JPEGs cheap to load
+            original.draft("RGB", (max_dimension, max_dimension))
+            image = ImageOps.exif_transpose(original)
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError, ValueError):
+        reject(file)
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    if image_format == "JPEG" or not has_alpha:
+        image = image.convert("RGB")
+    elif image.mode != "RGBA":
+        image = image.convert("RGBA")
+
+    output = io.BytesIO()
+    image.save(
+        output,
+        format=image_format,
+        quality=quality,
+        optimize=image_format == "JPEG",
+        icc_profile=image.info.get("icc_profile"),
+    )
+    name = Path(file.name or "image").stem + EXTENSIONS.get(image_format, f".{image_format.lower()}")
+    return ContentFile(output.getvalue(), name=name)
@@ -0,0 +1,91 @@
+import io
+import os
+import tempfile
+import time
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from PIL import Image
+from accounts.models import User
+from listings.models import PortfolioImage
+from listings.uploads import LocalImageStorage, prepare_images, spool, upload_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare serial raw uploads with pooled uploads, with and without preprocessing, '
+        'against a local storage that simulates latency and bandwidth'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=6, help='Images per upload request')
+        parser.add_argument('--width', type=int, default=4032, help='Width of the synthetic photos')
+        parser.add_argument('--height', type=int, default=3024, help='Height of the synthetic photos')
+        parser.add_argument('--latency', type=float, default=0.3, help='Simulated seconds per remote upload')
+        parser.add_argument('--bandwidth-mbps', type=float, default=20, help='Simulated upload bandwidth')
+        parser.add_argument('--rounds', type=int, default=3, help='Timed requests per strategy')
+
+    def handle(self, *args, **options):
+        files = [self.photo(i, options['width'], options['height']) for i in range(options['images'])]
+        raw_bytes = sum(file.size for file in files)
+
+        with tempfile.TemporaryDirectory() as root, transaction.atomic():
+            storage = LocalImageStorage(
+                root=root, latency=options['latency'], bandwidth=options['bandwidth_mbps'] * 125000
+            )
+            user = User.objects.create(email=f'benchmark-{int(time.time())}@example.com', username='benchmark_images')
+
+            serial = self.time_rounds(options['rounds'], lambda: self.upload_serially(files, storage))
+            pooled = self.time_rounds(options['rounds'], lambda: self.upload_pooled(user, files, storage))
+            processed = self.time_rounds(
+                options['rounds'], lambda: self.upload_pooled(user, self.rewind(prepare_images(files)), storage)
+            )
+            processed_bytes = sum(file.size for file in prepare_images(files))
+            transaction.set_rollback(True)
+
+        saved = 100 * (1 - processed_bytes / raw_bytes)
+        self.stdout.write(
+            f'{options["images"]} photos of {options["width"]}x{options["height"]}, '
+            f'{options["latency"]:.2f}s latency, {options["bandwidth_mbps"]:g} Mbit/s'
+        )
+        self.stdout.write(f'Bytes uploaded: {raw_bytes / 1e6:.2f} MB raw, '
+                          f'{processed_bytes / 1e6:.2f} MB preprocessed ({saved:.1f}% saved)')
+        self.stdout.write(f'Serial raw uploads:          {serial:.2f}s per request')
+        self.stdout.write(f'Pooled raw uploads:          {pooled:.2f}s per request')
+        self.stdout.write(f'Pooled preprocessed uploads: {processed:.2f}s per request (including preprocessing)')
+
+    def photo(self, index, width, height):
+        """A noisy gradient JPEG with EXIF, roughly as heavy as a phone photo."""
+        gradient = Image.linear_gradient('L').resize((width, height))
+        noise = Image.effect_noise((width, height), 40 + index)
+        image = Image.merge('RGB', (gradient, noise, Image.blend(gradient, noise, 0.5)))
+        exif = Image.Exif()
+        exif[0x010F] = 'Benchmark Phone'  # Make
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=95, exif=exif)
+        return SimpleUploadedFile(f'IMG_{index:04d}.JPG', output.getvalue(), content_type='image/jpeg')
+
+    def rewind(self, files):
+        for file in files:
+            file.seek(0)
+        return files
+
+    def upload_serially(self, files, storage):
+        for file in self.rewind(files):
+            path = spool(file)
+            storage.upload(path)
+            os.remove(path)
+
+    def upload_pooled(self, user, files, storage):
+        images = [
+            PortfolioImage(user=user, status=PortfolioImage.PENDING, pending_file=str(spool(file)))
+            for file in self.rewind(files)
+        ]
+        upload_pending(PortfolioImage.objects.bulk_create(images), storage)
+
+    def time_rounds(self, rounds, run):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            run()
+        return (time.perf_counter() - started) / rounds
@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from accounts.models import User
+from listings.models import SkillListing
+from listings.search import get_search_backend
+from skills.models import Skill
+
+
+WORDS = [
+    "python", "guitar", "photography", "design", "cooking", "spanish", "yoga", "marketing",
+    "piano", "painting", "writing", "django", "react", "drawing", "chess", "baking",
+    "excel", "video", "editing", "singing", "french", "running", "knitting", "gardening",
+    "carpentry", "math", "physics", "tutoring", "resume", "interview", "beginner", "advanced",
+]
+# Synthetic long tail so term frequencies look like real text rather than 32 stop words
+VOCABULARY = WORDS + [f"topic{i}" for i in range(5000)]
+
+
+class Command(BaseCommand):
+    help = 'Seed throwaway listings and compare full-text search with a naive icontains scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--listings', type=int, default=100000, help='Number of seeded listings')
+        parser.add_argument('--queries', type=int, default=50, help='Number of timed queries per strategy')
+        parser.add_argument('--limit', type=int, default=20, help='Page size of each search')
+
+    def handle(self, *args, **options):
+        # Everything happens in one transaction that is rolled back at the end
+        with transaction.atomic():
+            self.seed(options['listings'])
+            backend = get_search_backend()
+
+            started = time.perf_counter()
+            backend.rebuild(batch_size=5000)
+            build_seconds = time.perf_counter() - started
+
+            queries = [' '.join(random.sample(VOCABULARY, random.choice([1, 2]))) for _ in range(options['queries'])]
+            indexed = self.time_queries(queries, lambda q: backend.search(q, options['limit']))
+            naive = self.time_queries(queries, lambda q: self.naive_search(q, options['limit']))
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Indexed {options["listings"]} listings with {type(backend).__name__} in {build_seconds:.2f}s')
+        self.stdout.write(f'Full-text search: median {indexed[0]:.2f} ms, p95 {indexed[1]:.2f} ms')
+        self.stdout.write(f'icontains scan:   median {naive[0]:.2f} ms, p95 {naive[1]:.2f} ms')
+
+    def seed(self, count):
+        stamp = int(time.time())
+        users = User.objects.bulk_create([
+            User(email=f'benchmark-{stamp}-{i}@example.com', username=f'benchmark_{i}') for i in range(100)
+        ])
+        skills = Skill.objects.bulk_create([
+            Skill(skill_name=f'benchmark {word} {stamp}', category='Benchmark') for word in WORDS
+        ])
+        for start in range(0, count, 5000):
+            SkillListing.objects.bulk_create([
+                SkillListing(
+                    user=random.choice(users),
+                    skill_offered=random.choice(skills),
+                    skill_desired=random.choice(skills),
+                    title=' '.join(random.sample(VOCABULARY, 3)).title(),
+                    description=' '.join(random.choices(VOCABULARY, k=30)),
+                )
+                for _ in range(min(5000, count - start))
+            ])
+
+    def naive_search(self, query, limit):
+        condition = Q()
+        for term in query.split():
+            condition &= (
+                Q(title__icontains=term) | Q(description__icontains=term)
+                | Q(skill_offered__skill_name__icontains=term) | Q(skill_desired__skill_name__icontains=term)
+            )
+        listings = SkillListing.objects.filter(condition, status='active')
+        return list(listings.values_list('listing_id', flat=True)[:limit]), listings.count()
+
+    def time_queries(self, queries, search):
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
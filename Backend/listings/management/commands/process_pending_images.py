@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from listings.models import PortfolioImage
+from listings.uploads import upload_pending
+
+
+class Command(BaseCommand):
+    help = 'Upload portfolio images left pending by an interrupted upload, and retry failed ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-minutes',
+            type=int,
+            default=10,
+            help='Only pick up pending images queued at least this long ago'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of images uploaded per batch'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many images would be uploaded without uploading them'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options['older_than_minutes'])
+        stale = (
+            PortfolioImage.objects.filter(status=PortfolioImage.PENDING, uploaded_at__lt=cutoff)
+            | PortfolioImage.objects.filter(status=PortfolioImage.FAILED)
+        ).exclude(pending_file='').order_by('id')
+
+        total = stale.count()
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run: {total} portfolio images would be uploaded'))
+            return
+
+        processed = ready = 0
+        last_id = 0
+        while True:
+            images = list(stale.filter(id__gt=last_id)[:options['batch_size']])
+            if not images:
+                break
+            last_id = images[-1].id
+            ready += sum(image.status == PortfolioImage.READY for image in upload_pending(images))
+            processed += len(images)
+            self.stdout.write(f'Processed {processed}/{total} images')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully uploaded {ready} of {total} pending portfolio images')
+        )
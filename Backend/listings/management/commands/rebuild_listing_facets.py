@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from listings import facets
+
+
+class Command(BaseCommand):
+    help = 'Recompute the precomputed listing facet counts'
+
+    def handle(self, *args, **options):
+        rows = facets.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully rebuilt {rows} listing facet counts')
+        )
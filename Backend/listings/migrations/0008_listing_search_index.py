@@ -0,0 +1,53 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE listings_skilllisting ADD COLUMN search_vector tsvector')
+        schema_editor.execute(
+            'CREATE INDEX listings_skilllisting_search_idx ON listings_skilllisting USING gin (search_vector)'
+        )
+        # Fill the index with the schema as of this migration; see listings.search for the live version
+        schema_editor.execute(
+            "UPDATE listings_skilllisting AS l SET search_vector = "
+            "setweight(to_tsvector('english', coalesce(l.title, '')), 'A') || "
+            "setweight(to_tsvector('english', so.skill_name || ' ' || sd.skill_name), 'B') || "
+            "setweight(to_tsvector('english', coalesce(l.description, '')), 'C') "
+            "FROM skills_skill AS so, skills_skill AS sd "
+            "WHERE so.skill_id = l.skill_offered_id AND sd.skill_id = l.skill_desired_id AND l.status = 'active'"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE listings_search USING fts5("
+            "title, skills, description, tokenize = 'porter unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO listings_search (rowid, title, skills, description) "
+            "SELECT l.listing_id, l.title, so.skill_name || ' ' || sd.skill_name, l.description "
+            "FROM listings_skilllisting AS l "
+            "JOIN skills_skill AS so ON so.skill_id = l.skill_offered_id "
+            "JOIN skills_skill AS sd ON sd.skill_id = l.skill_desired_id "
+            "WHERE l.status = 'active'"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS listings_skilllisting_search_idx')
+        schema_editor.execute('ALTER TABLE listings_skilllisting DROP COLUMN IF EXISTS search_vector')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS listings_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0007_listing_feed_index'),
+        ('skills', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
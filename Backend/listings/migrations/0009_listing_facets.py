@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def count_facets(apps, schema_editor):
+    from listings.facets import rebuild
+    rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0008_listing_search_index'),
+        ('skills', '0002_listing_facets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=30)),
+                ('value', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='skilllisting',
+            index=models.Index(fields=['status', 'skill_offered', '-creation_date', '-listing_id'], name='listings_sk_status_1725f8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skilllisting',
+            index=models.Index(fields=['status', 'skill_desired', '-creation_date', '-listing_id'], name='listings_sk_status_5756ce_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skilllisting',
+            index=models.Index(fields=['status', 'location_preference', '-creation_date', '-listing_id'], name='listings_sk_status_34ecc5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skilllisting',
+            index=models.Index(fields=['skill_offered', 'skill_desired', 'status'], name='listings_sk_skill_o_f022d2_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='listingfacetcount',
+            constraint=models.UniqueConstraint(fields=('facet', 'value'), name='unique_listing_facet_value'),
+        ),
+        migrations.RunPython(count_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('listings', '0009_listing_facets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfolioimage',
+            name='pending_file',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='portfolioimage',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='portfolioimage',
+            name='image_url',
+            field=models.URLField(blank=True, default=''),
+        ),
+        migrations.AddIndex(
+            model_name='portfolioimage',
+            index=models.Index(fields=['status', 'uploaded_at'], name='listings_po_status_ce75a1_idx'),
+        ),
+    ]
@@ -24,10 +24,63 @@ class SkillListing(models.Model):
     location_preference = models.CharField(max_length=200, blank=True, null=True)
     portfolio_link = models.URLField( max_length=500, blank=True, null=True)
 
+    class Meta:
+      indexes = [
+        models.Index(fields=["status", "-creation_date", "-listing_id"]),
+        # Faceted feed filters (see facets.py)
+        models.Index(fields=["status", "skill_offered", "-creation_date", "-listing_id"]),
+        models.Index(fields=["status", "skill_desired", "-creation_date", "-listing_id"]),
+        models.Index(fields=["status", "location_preference", "-creation_date", "-listing_id"]),
+        models.Index(fields=["skill_offered", "skill_desired", "status"]),
+      ]
+
     def __str__(self):
       return f"{self.title} ({self.status})"
+
+
+class ListingFacetCount(models.Model):
+    """
+    Precomputed number of listings per facet value, maintained by the
+    listing signals (see facets.py) so facet counts never need a GROUP BY
+    over the listings table. `rebuild_listing_facets` recomputes it.
+    """
+    facet = models.CharField(max_length=30)
+    value = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+      constraints = [
+        models.UniqueConstraint(fields=["facet", "value"], name="unique_listing_facet_value"),
+      ]
+
+    def __str__(self):
+      return f"{self.facet}={self.value}: {self.count}"
     
+class ImageAsset(models.Model):
+  """
+  Content-addressed registry of stored images, keyed by the SHA-256 of the
+  preprocessed bytes; identical uploads share one stored file (uploads.py).
+  `url` stays empty until the first upload of the content completes.
+  """
+  content_hash = models.CharField(max_length=64, unique=True)
+  url = models.URLField(blank=True, default='')
+  size = models.PositiveIntegerField(default=0)
+  created_at = models.DateTimeField(auto_now_add=True)
+
+  def __str__(self):
+    return f"{self.content_hash[:12]} ({self.url or 'pending'})"
+
+
 class PortfolioImage(models.Model):
+  PENDING = 'pending'
+  READY = 'ready'
+  FAILED = 'failed'
+  STATUS_CHOICES = [
+    (PENDING, 'Pending'),
+    (READY, 'Ready'),
+    (FAILED, 'Failed'),
+  ]
+
   user = models.ForeignKey(
       settings.AUTH_USER_MODEL,
       on_delete=models.CASCADE,
@@ -40,8 +93,24 @@ class PortfolioImage(models.Model):
     null=True, 
     blank=True
   )
-  image_url = models.URLField()
+  asset = models.ForeignKey(
+    ImageAsset,
+    on_delete=models.SET_NULL,
+    related_name='portfolio_images',
+    null=True,
+    blank=True
+  )
+  # Empty until the upload pipeline (uploads.py) has stored the file
+  image_url = models.URLField(blank=True, default='')
+  status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=READY)
+  # Spooled local copy awaiting upload; cleared once the image is ready
+  pending_file = models.CharField(max_length=500, blank=True, default='')
   uploaded_at = models.DateTimeField(auto_now_add=True)
 
+  class Meta:
+    indexes = [
+      models.Index(fields=["status", "uploaded_at"]),
+    ]
+
   def __str__(self):
     return f"Portfolio image for {self.listing.title}"
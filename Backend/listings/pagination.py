@@ -0,0 +1,66 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(listing):
+  """Opaque cursor for a listing position: base64 of "<creation_date>|<listing_id>"."""
+  raw = f"{listing.creation_date.isoformat()}|{listing.listing_id}"
+  return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+  try:
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    creation_date, listing_id = raw.rsplit("|", 1)
+    return datetime.fromisoformat(creation_date), int(listing_id)
+  except (ValueError, UnicodeDecodeError):
+    raise ValidationError({"cursor": "Invalid cursor."})
+
+
+def parse_limit(value):
+  if value is None:
+    return DEFAULT_PAGE_SIZE
+  try:
+    limit = int(value)
+  except ValueError:
+    raise ValidationError({"limit": "A valid integer is required."})
+  return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def page_queryset(queryset, params):
+  """The requested page plus one lookahead row, and the page size."""
+  limit = parse_limit(params.get("limit"))
+  cursor = params.get("cursor")
+
+  if cursor:
+    creation_date, listing_id = decode_cursor(cursor)
+    queryset = queryset.filter(
+      Q(creation_date__lt=creation_date) | Q(creation_date=creation_date, listing_id__lt=listing_id)
+    )
+  return queryset.order_by("-creation_date", "-listing_id")[:limit + 1], limit
+
+
+def paginate_listings(queryset, params):
+  """
+  Keyset pagination over (creation_date, listing_id), newest first.
+  Pass the returned ``next`` cursor back as ``?cursor=`` for the next page;
+  it is None on the last page.
+  """
+  page, limit = page_queryset(queryset, params)
+  page = list(page)
+  next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+  return page[:limit], next_cursor
+
+
+def parse_page(value):
+  try:
+    return max(1, int(value or 1))
+  except ValueError:
+    raise ValidationError({"page": "A valid integer is required."})
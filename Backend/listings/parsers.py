@@ -0,0 +1,37 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class InvalidLine:
+    """Placeholder for an NDJSON line that is not valid JSON, reported per row by the importer"""
+    def __init__(self, message):
+        self.message = message
+
+
+class NDJSONParser(BaseParser):
+    """
+    Newline-delimited JSON: one JSON value per line, read line by line
+    from the request stream. Blank lines are skipped. When the view puts
+    ``max_rows`` in the parser context, reading stops with a ParseError at
+    the first row over the limit instead of loading the rest of the body.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8")
+        max_rows = parser_context.get("max_rows")
+        rows = []
+        for raw in stream:
+            line = raw.decode(encoding, errors="replace").strip()
+            if not line:
+                continue
+            if max_rows is not None and len(rows) == max_rows:
+                raise ParseError(f"Maximum {max_rows} listings per request.")
+            try:
+                rows.append(json.loads(line))
+            except ValueError as exc:
+                rows.append(InvalidLine(f"Invalid JSON: {exc}"))
+        return rows
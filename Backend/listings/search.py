@@ -0,0 +1,167 @@
+"""
+Full-text search over active skill listings.
+
+The index covers the listing title, description and the names of the
+offered and desired skills. Two backends keep it inside the database:
+
+- PostgreSQL: a ``search_vector`` tsvector column on the listings table
+  with a GIN index, ranked with ts_rank_cd.
+- SQLite: an FTS5 shadow table keyed by listing_id, ranked with bm25.
+
+Both are created by migration 0008 and kept in sync by listings.signals.
+``LISTING_SEARCH_BACKEND`` (dotted path) overrides the choice.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from skills.models import Skill
+from .models import SkillListing
+
+
+LISTINGS_TABLE = SkillListing._meta.db_table
+SKILLS_TABLE = Skill._meta.db_table
+FTS_TABLE = "listings_search"
+
+
+class BaseSearchBackend:
+    def index(self, listing_ids):
+        """(Re)index the given listings; inactive ones are dropped from the index."""
+        raise NotImplementedError
+
+    def remove(self, listing_ids):
+        raise NotImplementedError
+
+    def search(self, query, limit, offset=0):
+        """Return (ranked listing_ids for the page, total number of matches)."""
+        raise NotImplementedError
+
+    def rebuild(self, batch_size=1000):
+        """Reindex every listing; returns the number of listings scanned."""
+        indexed = 0
+        last_listing_id = 0
+        while True:
+            listing_ids = list(
+                SkillListing.objects.filter(listing_id__gt=last_listing_id)
+                .order_by("listing_id")
+                .values_list("listing_id", flat=True)[:batch_size]
+            )
+            if not listing_ids:
+                return indexed
+            self.index(listing_ids)
+            indexed += len(listing_ids)
+            last_listing_id = listing_ids[-1]
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    document_sql = f"""
+        UPDATE {LISTINGS_TABLE} AS l SET search_vector = CASE WHEN l.status = 'active' THEN
+            setweight(to_tsvector('english', coalesce(l.title, '')), 'A') ||
+            setweight(to_tsvector('english', so.skill_name || ' ' || sd.skill_name), 'B') ||
+            setweight(to_tsvector('english', coalesce(l.description, '')), 'C')
+        ELSE NULL END
+        FROM {SKILLS_TABLE} AS so, {SKILLS_TABLE} AS sd
+        WHERE so.skill_id = l.skill_offered_id
+          AND sd.skill_id = l.skill_desired_id
+          AND l.listing_id = ANY(%s)
+    """
+
+    def index(self, listing_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(self.document_sql, [list(listing_ids)])
+
+    def remove(self, listing_ids):
+        # The column lives on the listing row and goes away with it
+        pass
+
+    def search(self, query, limit, offset=0):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT listing_id, count(*) OVER ()
+                FROM {LISTINGS_TABLE}, websearch_to_tsquery('english', %s) AS query
+                WHERE search_vector @@ query
+                ORDER BY ts_rank_cd(search_vector, query) DESC, listing_id DESC
+                LIMIT %s OFFSET %s
+                """,
+                [query, limit, offset],
+            )
+            rows = cursor.fetchall()
+        return [row[0] for row in rows], (rows[0][1] if rows else 0)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    # Column weights for bm25: title, skills, description
+    weights = (10.0, 5.0, 1.0)
+
+    def index(self, listing_ids):
+        listing_ids = list(listing_ids)
+        placeholders = ", ".join(["%s"] * len(listing_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", listing_ids)
+            cursor.execute(
+                f"""
+                INSERT INTO {FTS_TABLE} (rowid, title, skills, description)
+                SELECT l.listing_id, l.title, so.skill_name || ' ' || sd.skill_name, l.description
+                FROM {LISTINGS_TABLE} AS l
+                JOIN {SKILLS_TABLE} AS so ON so.skill_id = l.skill_offered_id
+                JOIN {SKILLS_TABLE} AS sd ON sd.skill_id = l.skill_desired_id
+                WHERE l.status = 'active' AND l.listing_id IN ({placeholders})
+                """,
+                listing_ids,
+            )
+
+    def remove(self, listing_ids):
+        listing_ids = list(listing_ids)
+        placeholders = ", ".join(["%s"] * len(listing_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", listing_ids)
+
+    @staticmethod
+    def match_expression(query):
+        # Quote every term so user input can never be parsed as FTS5 syntax;
+        # the last term is a prefix match to support search-as-you-type
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return None
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+
+    def search(self, query, limit, offset=0):
+        expression = self.match_expression(query)
+        if expression is None:
+            return [], 0
+        weights = ", ".join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            # bm25() cannot share a statement with window functions, so count separately
+            cursor.execute(f"SELECT count(*) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression])
+            count = cursor.fetchone()[0]
+            if not count:
+                return [], 0
+            cursor.execute(
+                f"""
+                SELECT rowid
+                FROM {FTS_TABLE}
+                WHERE {FTS_TABLE} MATCH %s
+                ORDER BY bm25({FTS_TABLE}, {weights}), rowid DESC
+                LIMIT %s OFFSET %s
+                """,
+                [expression, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()], count
+
+
+BACKENDS = {
+    "postgresql": "listings.search.PostgresSearchBackend",
+    "sqlite": "listings.search.SQLiteSearchBackend",
+}
+
+
+def get_search_backend():
+    backend = getattr(settings, "LISTING_SEARCH_BACKEND", None) or BACKENDS.get(connection.vendor)
+    if backend is None:
+        raise NotImplementedError(f"No listing search backend for database vendor {connection.vendor!r}")
+    return import_string(backend)()
@@ -1,9 +1,10 @@
 # serializers.py
 from rest_framework import serializers
-from cloudinary.uploader import upload as cloudinary_upload
+from django.db.models import Prefetch
 from .models import SkillListing
 from accounts.models import User
 from listings.models import PortfolioImage
+from .uploads import upload_file
 
 
 class PublicUserSerializer(serializers.ModelSerializer):
@@ -17,12 +18,12 @@ class PortfolioImageSerializer(serializers.ModelSerializer):
 
   class Meta:
     model = PortfolioImage
-    fields = ["id", "image_url", "image_file", "uploaded_at"]
+    fields = ["id", "image_url", "status", "image_file", "uploaded_at"]
+    read_only_fields = ["status"]
 
   def create(self, validated_data):
     image_file = validated_data.pop("image_file")
-    upload_result = cloudinary_upload(image_file)
-    validated_data["image_url"] = upload_result.get("secure_url")
+    validated_data["image_url"] = upload_file(image_file)
     return PortfolioImage.objects.create(**validated_data)
 
 
@@ -45,6 +46,27 @@ class SkillListingSerializer(serializers.ModelSerializer):
       "portfolio_images",
     ]
 
+  @classmethod
+  def setup_eager_loading(cls, queryset):
+    """
+    Load the user, both skills and the portfolio images with the listings,
+    restricted to the columns this serializer reads, so a page of listings
+    costs a constant number of queries.
+    """
+    user_fields = [f"user__{name}" for name in PublicUserSerializer.Meta.fields]
+    return queryset.select_related("user", "skill_offered", "skill_desired").only(
+      "listing_id", "user", "skill_offered", "skill_desired",
+      "title", "description", "status", "creation_date", "last_updated",
+      "location_preference", "portfolio_link",
+      "skill_offered__skill_name", "skill_desired__skill_name",
+      *user_fields,
+    ).prefetch_related(
+      Prefetch(
+        "portfolio_images",
+        queryset=PortfolioImage.objects.only("id", "listing_id", "image_url", "status", "uploaded_at"),
+      )
+    )
+
   def create(self, validated_data):
     images_data = validated_data.pop("portfolio_images", [])
     listing = SkillListing.objects.create(**validated_data)
@@ -57,4 +79,4 @@ class SkillListingSerializer(serializers.ModelSerializer):
 class UserPortfolioImageSerializer(serializers.ModelSerializer):
   class Meta:
     model = PortfolioImage
-    fields = ["id", "listing", "image_url", "uploaded_at"]
\ No newline at end of file
+    fields = ["id", "listing", "image_url", "status", "uploaded_at"]
\ No newline at end of file
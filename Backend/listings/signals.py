@@ -0,0 +1,93 @@
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.contrib.auth import get_user_model
+from django.dispatch import receiver
+from skills.models import Skill
+from .models import SkillListing, PortfolioImage
+from .search import get_search_backend
+from .serializers import PublicUserSerializer
+from . import facets, feed_cache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=SkillListing)
+def index_listing(sender, instance, **kwargs):
+    """Keep the search index in step with the listing (inactive listings drop out)"""
+    get_search_backend().index([instance.listing_id])
+
+
+@receiver(post_delete, sender=SkillListing)
+def unindex_listing(sender, instance, **kwargs):
+    get_search_backend().remove([instance.listing_id])
+
+
+@receiver(post_save, sender=Skill)
+def reindex_skill_listings(sender, instance, created, **kwargs):
+    """Skill names are part of the indexed document; reindex listings using a renamed skill"""
+    if created:
+        return
+    listing_ids = list(
+        SkillListing.objects.filter(Q(skill_offered=instance) | Q(skill_desired=instance))
+        .values_list("listing_id", flat=True)
+    )
+    backend = get_search_backend()
+    for start in range(0, len(listing_ids), 1000):
+        backend.index(listing_ids[start:start + 1000])
+
+
+@receiver(pre_save, sender=SkillListing)
+def remember_facet_values(sender, instance, **kwargs):
+    instance._facet_values = facets.current_values(instance.pk) if instance.pk else None
+
+
+@receiver(post_save, sender=SkillListing)
+def count_listing_facets(sender, instance, **kwargs):
+    """Move the listing's facet contribution from its old values to its new ones"""
+    facets.adjust(getattr(instance, "_facet_values", None), facets.values_of(instance))
+
+
+@receiver(post_delete, sender=SkillListing)
+def uncount_listing_facets(sender, instance, **kwargs):
+    facets.adjust(facets.values_of(instance), None)
+
+
+@receiver(pre_save, sender=Skill)
+def remember_skill_category(sender, instance, **kwargs):
+    instance._category = (
+        Skill.objects.filter(pk=instance.pk).values_list("category", flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Skill)
+def recount_category_facet(sender, instance, created, **kwargs):
+    """A recategorized skill moves all of its listings; recount that facet"""
+    if not created and getattr(instance, "_category", instance.category) != instance.category:
+        facets.rebuild(["category"])
+
+
+@receiver(post_save, sender=PortfolioImage)
+@receiver(post_delete, sender=PortfolioImage)
+def touch_image_listing(sender, instance, **kwargs):
+    feed_cache.touch_listings([instance.listing_id])
+
+
+@receiver(post_save, sender=SkillListing)
+@receiver(post_delete, sender=SkillListing)
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_feed_cache(sender, **kwargs):
+    feed_cache.invalidate()
+
+
+# Profile fields embedded in every listing
+PUBLIC_PROFILE_FIELDS = set(PublicUserSerializer.Meta.fields)
+
+
+@receiver(post_save, sender=User)
+def invalidate_feed_cache_for_profile(sender, instance, created, update_fields=None, **kwargs):
+    """New users have no listings yet, and logins only save last_login"""
+    if created or (update_fields and not PUBLIC_PROFILE_FIELDS & set(update_fields)):
+        return
+    feed_cache.invalidate()
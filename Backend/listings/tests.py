@@ -1,3 +1,120 @@
-from django.test import TestCase
+import json
+from io import BytesIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils.http import http_date
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from skills.models import Skill
+from .bulk import aexport_listings
+from .models import SkillListing
+from .parsers import NDJSONParser
+
+
+class ListingStatusFilterTests(TestCase):
+    def setUp(self):
+        # Feed responses are cached by path, and on_commit never bumps the generation in a TestCase
+        cache.clear()
+        self.owner = User.objects.create_user(email="owner@example.com", password="pw12345!", username="owner")
+        self.other = User.objects.create_user(email="other@example.com", password="pw12345!", username="other")
+        guitar = Skill.objects.create(skill_name="Guitar", category="Music")
+        french = Skill.objects.create(skill_name="French", category="Languages")
+        for user, listing_status in [(self.owner, "active"), (self.owner, "inactive"), (self.other, "inactive")]:
+            SkillListing.objects.create(
+                user=user, skill_offered=guitar, skill_desired=french,
+                title=f"{user.username} {listing_status}", description="", status=listing_status,
+            )
+
+    def titles(self, user=None, query=""):
+        client = APIClient()
+        if user:
+            client.force_authenticate(user)
+        response = client.get(f"/api/v1/listings/{query}", secure=True)
+        if response.status_code != 200:
+            return response.status_code
+        return sorted(listing["title"] for listing in response.data["results"])
+
+    def test_public_feed_only_lists_active_listings(self):
+        self.assertEqual(self.titles(), ["owner active"])
+        self.assertEqual(self.titles(query="?status=active"), ["owner active"])
+
+    def test_other_statuses_are_restricted_to_the_owner(self):
+        self.assertEqual(self.titles(query="?status=inactive"), 401)
+        self.assertEqual(self.titles(self.owner, "?status=inactive"), ["owner inactive"])
+        self.assertEqual(self.titles(self.other, "?status=inactive"), ["other inactive"])
+
+
+class ListingFeedConditionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(email="owner@example.com", password="pw12345!", username="owner")
+        guitar = Skill.objects.create(skill_name="Guitar", category="Music")
+        french = Skill.objects.create(skill_name="French", category="Languages")
+        self.older, self.newer = [
+            SkillListing.objects.create(user=user, skill_offered=guitar, skill_desired=french, title=title, description="")
+            for title in ("Older", "Newer")
+        ]
+        self.client = APIClient()
+
+    def test_feed_page_has_no_last_modified(self):
+        response = self.client.get("/api/v1/listings/", secure=True)
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+        detail = self.client.get(f"/api/v1/listings/{self.older.listing_id}/", secure=True)
+        self.assertIn("Last-Modified", detail)
+
+    def test_deactivating_a_listing_changes_the_page(self):
+        response = self.client.get("/api/v1/listings/", secure=True)
+        self.assertEqual(self.client.get("/api/v1/listings/", secure=True, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        # The newest remaining listing is unchanged, yet the page is not
+        self.older.status = "inactive"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.older.save()
+        self.assertEqual(self.client.get("/api/v1/listings/", secure=True, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+        response = self.client.get("/api/v1/listings/", secure=True, HTTP_IF_MODIFIED_SINCE=http_date())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([listing["title"] for listing in response.data["results"]], ["Newer"])
+
+
+class NDJSONParserTests(SimpleTestCase):
+    def parse(self, body, **context):
+        return NDJSONParser().parse(BytesIO(body), parser_context=context)
+
+    def test_stops_at_the_first_row_over_the_limit(self):
+        body = b'{"n": 1}\n\n{"n": 2}\n{"n": 3}\n{"n": 4}\n'
+        stream = BytesIO(body)
+        with self.assertRaises(ParseError):
+            NDJSONParser().parse(stream, parser_context={"max_rows": 2})
+        # The fourth row is never read
+        self.assertEqual(body[stream.tell():], b'{"n": 4}\n')
+
+    def test_blank_lines_do_not_count_towards_the_limit(self):
+        self.assertEqual(self.parse(b'{"n": 1}\n\n\n{"n": 2}\n', max_rows=2), [{"n": 1}, {"n": 2}])
+
+
+class ListingExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="owner@example.com", password="pw12345!", username="owner")
+        guitar = Skill.objects.create(skill_name="Guitar", category="Music")
+        french = Skill.objects.create(skill_name="French", category="Languages")
+        for title in ("First", "Second"):
+            SkillListing.objects.create(user=self.user, skill_offered=guitar, skill_desired=french, title=title, description="")
+
+    def test_sync_and_async_exports_match(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get("/api/v1/listings/export/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines(keepends=True)
+        self.assertEqual([json.loads(line)["title"] for line in lines], ["First", "Second"])
+
+        async def collect():
+            return [line async for line in aexport_listings(self.user)]
+
+        self.assertEqual(async_to_sync(collect)(), lines)
@@ -0,0 +1,270 @@
+"""
+Portfolio and profile image upload pipeline.
+
+Incoming files, preprocessed by images.py, are spooled to local disk and
+recorded as pending PortfolioImage rows; the remote uploads then run
+concurrently on a bounded thread pool and each row receives its URL
+(status "ready") when its upload completes. ``IMAGE_UPLOAD_MODE`` selects where the uploads are awaited:
+
+- "inline": the request waits for the parallel uploads, so the response
+  carries final URLs after one upload round-trip instead of one per image;
+- "background": the request returns pending rows straight away and the
+  uploads finish on a background thread once the transaction commits.
+
+Uploads are deduplicated by content: every image references an ImageAsset
+keyed by the SHA-256 of its preprocessed bytes, and content that was
+already stored reuses the asset's URL without any remote call.
+
+Rows left pending by a crashed process, and failed uploads, are retried by
+`process_pending_images`. The remote store is chosen with
+``IMAGE_STORAGE_BACKEND`` (dotted path); ``LocalImageStorage`` keeps files
+under MEDIA_ROOT so the pipeline can be exercised offline.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from cloudinary.uploader import upload as cloudinary_upload
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+
+from .images import preprocess
+from .models import ImageAsset, PortfolioImage
+from .feed_cache import touch_listings
+
+logger = logging.getLogger(__name__)
+
+
+class BaseImageStorage:
+    def upload(self, path):
+        """Store the local file at ``path`` and return its public URL."""
+        raise NotImplementedError
+
+
+class CloudinaryImageStorage(BaseImageStorage):
+    def upload(self, path):
+        return cloudinary_upload(str(path)).get("secure_url")
+
+
+class LocalImageStorage(BaseImageStorage):
+    """
+    Filesystem stand-in that copies files under MEDIA_ROOT/portfolio.
+    To mimic a remote store, every upload waits ``latency`` seconds plus,
+    when ``bandwidth`` (bytes per second) is given, its transfer time over
+    a link shared by all concurrent uploads.
+    """
+    def __init__(self, root=None, base_url=None, latency=None, bandwidth=None):
+        self.root = Path(root or Path(settings.MEDIA_ROOT) / "portfolio")
+        self.base_url = base_url or f"{settings.MEDIA_URL}portfolio/"
+        self.latency = getattr(settings, "IMAGE_LOCAL_STORAGE_LATENCY", 0) if latency is None else latency
+        self.bandwidth = bandwidth
+        self._link_lock = threading.Lock()
+        self._link_free_at = 0.0
+
+    def transfer_time(self, size):
+        if not self.bandwidth:
+            return 0
+        with self._link_lock:
+            now = time.monotonic()
+            self._link_free_at = max(now, self._link_free_at) + size / self.bandwidth
+            return self._link_free_at - now
+
+    def upload(self, path):
+        delay = self.latency + self.transfer_time(os.path.getsize(path))
+        if delay:
+            time.sleep(delay)
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = f"{uuid.uuid4().hex}{Path(path).suffix}"
+        shutil.copyfile(path, self.root / name)
+        return f"{self.base_url}{name}"
+
+
+def get_image_storage():
+    backend = getattr(settings, "IMAGE_STORAGE_BACKEND", "listings.uploads.CloudinaryImageStorage")
+    return import_string(backend)()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, max_workers):
+    """Process-wide thread pool, created on first use."""
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"images-{name}")
+        return _pools[name]
+
+
+def upload_pool():
+    return get_pool("upload", getattr(settings, "IMAGE_UPLOAD_WORKERS", 6))
+
+
+def prepare_images(files):
+    """
+    Preprocess every file up front (in parallel; Pillow releases the GIL
+    while resizing and encoding), so one bad upload rejects the request
+    before anything is stored.
+    """
+    return list(get_pool("preprocess", os.cpu_count() or 2).map(preprocess, files))
+
+
+def spool(file):
+    """Write an uploaded file to the local spool directory and return its path."""
+    spool_dir = Path(getattr(settings, "IMAGE_UPLOAD_SPOOL_DIR", Path(settings.MEDIA_ROOT) / "upload_spool"))
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    path = spool_dir / f"{uuid.uuid4().hex}{Path(file.name or '').suffix.lower()}"
+    with open(path, "wb") as out:
+        for chunk in file.chunks():
+            out.write(chunk)
+    return path
+
+
+def discard(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def content_hash(file):
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def register_assets(sizes):
+    """
+    Return {content hash: ImageAsset} for ``sizes`` ({content hash: bytes}),
+    registering unknown content as assets that are not uploaded yet (empty url).
+    """
+    ImageAsset.objects.bulk_create(
+        [ImageAsset(content_hash=digest, size=size) for digest, size in sizes.items()],
+        ignore_conflicts=True,
+    )
+    return ImageAsset.objects.in_bulk(list(sizes), field_name="content_hash")
+
+
+def upload_file(file, storage=None):
+    """Preprocess and upload a single file synchronously (profile pictures); returns its URL."""
+    file = preprocess(file)
+    digest = content_hash(file)
+    asset = register_assets({digest: file.size})[digest]
+    if asset.url:
+        return asset.url
+
+    storage = storage or get_image_storage()
+    path = spool(file)
+    try:
+        asset.url = storage.upload(path)
+    finally:
+        discard(path)
+    asset.save(update_fields=["url"])
+    return asset.url
+
+
+def upload_pending(images, storage=None):
+    """
+    Upload the spooled files of ``images`` concurrently and save the
+    results with a single bulk_update. Each asset is uploaded once, however
+    many of the images share it, and assets stored in the meantime are not
+    uploaded again. Only the pool threads touch the network; the database
+    is written from the calling thread.
+    """
+    images = [image for image in images if image.pending_file]
+    if not images:
+        return images
+    storage = storage or get_image_storage()
+
+    # Images without an asset (queued before the registry existed) upload on their own
+    groups = defaultdict(list)
+    for image in images:
+        groups[image.asset_id or ("image", image.pk)].append(image)
+    assets = ImageAsset.objects.in_bulk([key for key in groups if isinstance(key, int)])
+
+    def upload(key):
+        asset = assets.get(key)
+        if asset is not None and asset.url:
+            return asset.url
+        try:
+            return storage.upload(groups[key][0].pending_file)
+        except Exception:
+            logger.exception("Upload of portfolio image %s failed", groups[key][0].pk)
+            return None
+
+    uploaded = []
+    for key, url in zip(list(groups), upload_pool().map(upload, list(groups))):
+        for image in groups[key]:
+            if url:
+                discard(image.pending_file)
+                image.image_url, image.status, image.pending_file = url, PortfolioImage.READY, ""
+            else:
+                image.status = PortfolioImage.FAILED
+        asset = assets.get(key)
+        if url and asset is not None and not asset.url:
+            asset.url = url
+            uploaded.append(asset)
+
+    ImageAsset.objects.bulk_update(uploaded, ["url"])
+    PortfolioImage.objects.bulk_update(images, ["image_url", "status", "pending_file"])
+    # bulk_update sends no signals
+    touch_listings(image.listing_id for image in images)
+    return images
+
+
+def upload_in_background(image_ids):
+    def job():
+        try:
+            upload_pending(PortfolioImage.objects.filter(pk__in=image_ids))
+        except Exception:
+            logger.exception("Background upload of portfolio images %s failed", image_ids)
+        finally:
+            close_old_connections()
+
+    # A separate single-thread pool runs the jobs so they never wait on
+    # upload slots held by themselves
+    get_pool("background", 1).submit(job)
+
+
+def queue_portfolio_images(user, files, listing=None):
+    """
+    Spool ``files`` (the output of prepare_images) as pending
+    portfolio images of ``user`` (and ``listing``) and start uploading
+    them. Returns the new rows; in inline mode they already carry their URLs.
+    """
+    digests = [content_hash(file) for file in files]
+    assets = register_assets({digest: file.size for digest, file in zip(digests, files)})
+    images = []
+    for file, digest in zip(files, digests):
+        asset = assets[digest]
+        if asset.url:
+            # Known content: reuse the stored file, no upload
+            images.append(PortfolioImage(
+                user=user, listing=listing, asset=asset, image_url=asset.url, status=PortfolioImage.READY
+            ))
+        else:
+            images.append(PortfolioImage(
+                user=user, listing=listing, asset=asset, status=PortfolioImage.PENDING, pending_file=str(spool(file))
+            ))
+    images = PortfolioImage.objects.bulk_create(images)
+    touch_listings([listing.listing_id] if listing else [])
+
+    pending = [image for image in images if image.pending_file]
+    if not pending:
+        return images
+    if getattr(settings, "IMAGE_UPLOAD_MODE", "inline") == "background":
+        image_ids = [image.pk for image in pending]
+        transaction.on_commit(lambda: upload_in_background(image_ids))
+    else:
+        upload_pending(pending)
+    return images
@@ -1,7 +1,15 @@
 from django.urls import path
-from .views import SkillListingView
+from .views import (
+  SkillListingView, SkillListingSearchView, SkillListingFacetsView, ListingCacheStatsView,
+  SkillListingBulkView, SkillListingExportView,
+)
 
 urlpatterns = [
   path('', SkillListingView.as_view(), name='listings'),
+  path('search/', SkillListingSearchView.as_view(), name='listing-search'),
+  path('facets/', SkillListingFacetsView.as_view(), name='listing-facets'),
+  path('cache-stats/', ListingCacheStatsView.as_view(), name='listing-cache-stats'),
+  path('bulk/', SkillListingBulkView.as_view(), name='listing-bulk'),
+  path('export/', SkillListingExportView.as_view(), name='listing-export'),
   path('<int:listing_id>/', SkillListingView.as_view(), name='listing-detail')
 ]
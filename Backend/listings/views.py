@@ -1,14 +1,42 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from cloudinary.uploader import upload as cloudinary_upload
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
 
 from .models import SkillListing
 from skills.models import Skill
 from listings.models import PortfolioImage
 from .serializers import SkillListingSerializer
+from .pagination import paginate_listings, page_queryset, parse_limit, parse_page
+from .search import get_search_backend
+from . import facets, feed_cache
+from .bulk import MAX_ROWS, import_listings, export_listings, aexport_listings
+from .parsers import NDJSONParser
+from .uploads import prepare_images, queue_portfolio_images
+from swapo.conditional import conditional, latest
+
+
+# Everything a serialized listing depends on changes at least one of these
+LISTING_VERSION_FIELDS = (
+    "listing_id", "last_updated", "user__updated_at", "skill_offered__updated_at", "skill_desired__updated_at",
+)
+
+
+def listing_validators(view, request, listing_id=None):
+    """Validators of a listing or a feed page (ETag only), from one narrow query over its rows"""
+    listings = SkillListing.objects.all()
+    if listing_id:
+        rows = list(listings.filter(listing_id=listing_id).values_list(*LISTING_VERSION_FIELDS))
+        if not rows:
+            return None
+        return rows, latest(*rows[0][1:])
+    page, _ = page_queryset(facets.apply_filters(listings, request.query_params, request.user), request.query_params)
+    return list(page.values_list(*LISTING_VERSION_FIELDS)), None
 
 
 class SkillListingView(APIView):
@@ -23,15 +51,28 @@ class SkillListingView(APIView):
             return [AllowAny()]
         return [IsAuthenticated()]
 
+    @conditional(listing_validators)
     def get(self, request, listing_id=None):
+        if not listing_id and facets.owner_only(request.query_params):
+            # The requester's own non-active listings: never shared through the response cache
+            return Response(self.get_payload(request), status=status.HTTP_200_OK, headers={"Cache-Control": "private"})
+        # Served from the versioned response cache (feed_cache.py) when nothing changed
+        payload, state = feed_cache.cached_payload(request, lambda: self.get_payload(request, listing_id))
+        return Response(payload, status=status.HTTP_200_OK, headers={"X-Cache": state})
+
+    def get_payload(self, request, listing_id=None):
+        listings = SkillListingSerializer.setup_eager_loading(SkillListing.objects.all())
+
         if listing_id:
-            listing = get_object_or_404(SkillListing, listing_id=listing_id)
-            serializer = SkillListingSerializer(listing)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            listing = get_object_or_404(listings, listing_id=listing_id)
+            return SkillListingSerializer(listing).data
 
-        listings = SkillListing.objects.filter(status='active').order_by('-creation_date')
-        serializer = SkillListingSerializer(listings, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # Keyset-paginated feed: ?cursor=<next>&limit=<n>, filtered by any facet
+        # (?skill_offered=<id>&skill_desired=<id>&category=&status=&location=)
+        listings = facets.apply_filters(listings, request.query_params, request.user)
+        page, next_cursor = paginate_listings(listings, request.query_params)
+        serializer = SkillListingSerializer(page, many=True)
+        return {"results": serializer.data, "next": next_cursor}
 
     def post(self, request):
         """
@@ -60,20 +101,17 @@ class SkillListingView(APIView):
 
             serializer = SkillListingSerializer(data=data)
             if serializer.is_valid():
-                listing = serializer.save(user=request.user)
-
                 # Limit to 6 images
                 if len(images) > 6:
                     return Response({"error": "Maximum 6 portfolio images allowed."},
                                     status=status.HTTP_400_BAD_REQUEST)
 
-                for img in images:
-                    upload_result = cloudinary_upload(img)
-                    PortfolioImage.objects.create(
-                        listing=listing,
-                        user=request.user,
-                        image_url=upload_result.get("secure_url")
-                    )
+                # Resize/re-encode first so invalid images are rejected before the listing is saved
+                images = prepare_images(images)
+                listing = serializer.save(user=request.user)
+
+                # Uploaded concurrently; see uploads.py
+                queue_portfolio_images(request.user, images, listing=listing)
 
                 return Response(SkillListingSerializer(listing).data, status=status.HTTP_201_CREATED)
 
@@ -88,15 +126,9 @@ class SkillListingView(APIView):
             if PortfolioImage.objects.filter(user=request.user, listing__isnull=True).count() + len(images) > 6:
                 return Response({"error": "Maximum 6 user portfolio images allowed."}, status=400)
 
-            uploaded_urls = []
-            for img in images:
-                upload_result = cloudinary_upload(img)
-                pi = PortfolioImage.objects.create(
-                    user=request.user,
-                    listing=None,  # not tied to any listing
-                    image_url=upload_result.get("secure_url")
-                )
-                uploaded_urls.append(pi.image_url)
+            # not tied to any listing
+            uploaded = queue_portfolio_images(request.user, prepare_images(images))
+            uploaded_urls = [pi.image_url for pi in uploaded if pi.image_url]
 
             return Response({"uploaded_images": uploaded_urls}, status=status.HTTP_201_CREATED)
 
@@ -117,13 +149,7 @@ class SkillListingView(APIView):
             if images:
                 if listing.portfolio_images.count() + len(images) > 5:
                     return Response({"error": "Only 5 images allowed"}, status=400)
-                for img in images:
-                    upload_result = cloudinary_upload(img)
-                    PortfolioImage.objects.create(
-                        listing=listing,
-                        user=request.user,
-                        image_url=upload_result.get("secure_url")
-                    )
+                queue_portfolio_images(request.user, prepare_images(images), listing=listing)
             return Response(SkillListingSerializer(listing).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -131,3 +157,109 @@ class SkillListingView(APIView):
         listing = get_object_or_404(SkillListing, listing_id=listing_id, user=request.user)
         listing.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class SkillListingSearchView(APIView):
+    """
+    GET: public, ranked full-text search over active listings
+    GET /api/v1/listings/search/?q=<terms>&page=<n>&limit=<n>
+    Matches title, description and offered/desired skill names.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"error": "Query parameter 'q' is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = parse_limit(request.query_params.get("limit"))
+        page = parse_page(request.query_params.get("page"))
+        listing_ids, count = get_search_backend().search(query, limit, (page - 1) * limit)
+
+        # Load the page in one go and restore the ranking order
+        listings = SkillListingSerializer.setup_eager_loading(SkillListing.objects.all()).in_bulk(listing_ids)
+        ranked = [listings[listing_id] for listing_id in listing_ids if listing_id in listings]
+
+        return Response({
+            "count": count,
+            "page": page,
+            "next": page + 1 if page * limit < count else None,
+            "results": SkillListingSerializer(ranked, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class SkillListingFacetsView(APIView):
+    """
+    GET: public, listing counts per facet value
+    GET /api/v1/listings/facets/
+    Served from the precomputed ListingFacetCount table.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        return Response(facets.get_facet_counts(), status=status.HTTP_200_OK)
+
+
+class ListingCacheStatsView(APIView):
+    """
+    GET: admin only, hit/miss counters of the listings response cache
+    GET /api/v1/listings/cache-stats/
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(feed_cache.stats(), status=status.HTTP_200_OK)
+
+
+class SkillListingBulkView(APIView):
+    """
+    POST: authenticated, create many listings in one request
+    POST /api/v1/listings/bulk/ with a JSON array, or NDJSON (Content-Type: application/x-ndjson)
+    Rows carry title, description, skill_offered and skill_desired (skill names, created when
+    unknown) and optionally status, location_preference and portfolio_link. Invalid rows are
+    reported by index and skipped.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def get_parser_context(self, http_request):
+        # Lets the NDJSON parser stop reading at the row limit
+        context = super().get_parser_context(http_request)
+        context["max_rows"] = MAX_ROWS
+        return context
+
+    def post(self, request):
+        try:
+            rows = request.data
+        except ParseError as exc:
+            return Response({"error": str(exc.detail)}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(rows, list):
+            return Response({"error": "Expected a JSON array or NDJSON rows."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > MAX_ROWS:
+            return Response({"error": f"Maximum {MAX_ROWS} listings per request."}, status=status.HTTP_400_BAD_REQUEST)
+
+        listings, errors = import_listings(request.user, rows)
+        return Response({
+            "created": len(listings),
+            "listing_ids": [listing.listing_id for listing in listings],
+            "errors": errors,
+        }, status=status.HTTP_201_CREATED if listings else status.HTTP_400_BAD_REQUEST)
+
+
+class SkillListingExportView(APIView):
+    """
+    GET: authenticated, stream the user's own listings as NDJSON
+    GET /api/v1/listings/export/
+    The rows use the bulk import format. Under ASGI the body is an async iterator, which
+    Django would otherwise buffer whole before sending.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if isinstance(request._request, ASGIRequest):
+            rows = aexport_listings(request.user)
+        else:
+            rows = export_listings(request.user)
+        response = StreamingHttpResponse(rows, content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="listings.ndjson"'
+        return response
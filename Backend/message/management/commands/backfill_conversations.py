@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Count, Window
+from django.db.models.functions import Least, Greatest, RowNumber
+from message.models import Message, Conversation
+
+
+class Command(BaseCommand):
+    help = 'Create or refresh Conversation rows from existing messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of conversations written per bulk upsert'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        messages = Message.objects.exclude(sender=F('receiver'))
+
+        # Unread totals keyed by (sender_id, receiver_id)
+        unread = {
+            (sender_id, receiver_id): count
+            for sender_id, receiver_id, count in messages.filter(is_read=False)
+            .values_list('sender_id', 'receiver_id')
+            .annotate(count=Count('message_id'))
+            .order_by()
+        }
+
+        # Latest message per normalized pair
+        low = Least('sender_id', 'receiver_id')
+        high = Greatest('sender_id', 'receiver_id')
+        latest = (
+            messages.annotate(
+                low=low,
+                high=high,
+                position=Window(
+                    RowNumber(),
+                    partition_by=[low, high],
+                    order_by=[F('timestamp').desc(), F('message_id').desc()],
+                ),
+            )
+            .filter(position=1)
+            .values_list('message_id', 'low', 'high', 'timestamp')
+        )
+
+        written = 0
+        batch = []
+        with transaction.atomic():
+            for message_id, user_low_id, user_high_id, timestamp in latest.iterator(chunk_size=batch_size):
+                batch.append(Conversation(
+                    user_low_id=user_low_id,
+                    user_high_id=user_high_id,
+                    last_message_id=message_id,
+                    last_activity=timestamp,
+                    unread_low=unread.get((user_high_id, user_low_id), 0),
+                    unread_high=unread.get((user_low_id, user_high_id), 0),
+                ))
+                if len(batch) >= batch_size:
+                    written += self.flush(batch)
+                    batch = []
+            written += self.flush(batch)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully backfilled {written} conversations')
+        )
+
+    def flush(self, batch):
+        if not batch:
+            return 0
+        Conversation.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['user_low', 'user_high'],
+            update_fields=['last_message', 'last_activity', 'unread_low', 'unread_high'],
+        )
+        return len(batch)
@@ -1,9 +1,17 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q, F, Count
+from django.db.models.functions import Greatest
 from django.utils import timezone
 from accounts.models import User
 from trade.models import Trade, TradeProposal
 
 
+class MessageQuerySet(models.QuerySet):
+    def involving(self, user):
+        """Messages sent OR received by the user."""
+        return self.filter(Q(sender=user) | Q(receiver=user))
+
+
 class Message(models.Model):
     MESSAGE_TYPES = [
         ("text", "Text"),
@@ -26,5 +34,156 @@ class Message(models.Model):
     is_read = models.BooleanField(default=False)
     message_type = models.CharField(max_length=20, choices=MESSAGE_TYPES, default="text")
 
+    objects = MessageQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["sender", "receiver", "-timestamp"]),
+            models.Index(fields=["receiver", "is_read"]),
+        ]
+
     def __str__(self):
         return f"Message {self.message_id} from {self.sender} to {self.receiver}"
+
+
+class ConversationQuerySet(models.QuerySet):
+    def involving(self, user):
+        return self.filter(Q(user_low=user) | Q(user_high=user))
+
+    def summaries(self, user):
+        """
+        Inbox for a user read straight from the denormalized rows:
+        other user, last message and unread count, newest first.
+        """
+        conversations = (
+            self.involving(user)
+            .select_related(
+                "user_low", "user_high",
+                "last_message__sender", "last_message__receiver",
+            )
+            .order_by("-last_activity")
+        )
+        return [
+            {
+                "other_user": conversation.other_user(user),
+                "last_message": conversation.last_message,
+                "unread_count": conversation.unread_for(user),
+            }
+            for conversation in conversations
+        ]
+
+
+class Conversation(models.Model):
+    """
+    Persisted summary of the messages exchanged between two users.
+    The pair is stored normalized so that user_low always holds the
+    smaller user_id; unread_low/unread_high count the messages each
+    participant has not read yet.
+    """
+    conversation_id = models.AutoField(primary_key=True)
+    user_low = models.ForeignKey(User, on_delete=models.CASCADE, related_name="conversations_as_low")
+    user_high = models.ForeignKey(User, on_delete=models.CASCADE, related_name="conversations_as_high")
+
+    last_message = models.ForeignKey(
+        Message, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    last_activity = models.DateTimeField(default=timezone.now)
+    unread_low = models.PositiveIntegerField(default=0)
+    unread_high = models.PositiveIntegerField(default=0)
+
+    objects = ConversationQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user_low", "user_high"], name="unique_conversation_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["user_low", "-last_activity"]),
+            models.Index(fields=["user_high", "-last_activity"]),
+        ]
+
+    def __str__(self):
+        return f"Conversation {self.conversation_id} between {self.user_low} and {self.user_high}"
+
+    @staticmethod
+    def normalize(user_id_a, user_id_b):
+        return (user_id_a, user_id_b) if user_id_a <= user_id_b else (user_id_b, user_id_a)
+
+    @staticmethod
+    def unread_field(user_id, user_low_id):
+        return "unread_low" if user_id == user_low_id else "unread_high"
+
+    def other_user(self, user):
+        return self.user_high if self.user_low_id == user.pk else self.user_low
+
+    def unread_for(self, user):
+        return self.unread_low if self.user_low_id == user.pk else self.unread_high
+
+    @classmethod
+    def record_message(cls, message):
+        """Point the pair's conversation at a new message and bump the receiver's unread counter."""
+        if message.sender_id == message.receiver_id:
+            return None
+
+        user_low_id, user_high_id = cls.normalize(message.sender_id, message.receiver_id)
+        unread_field = cls.unread_field(message.receiver_id, user_low_id)
+
+        with transaction.atomic():
+            conversation, _ = cls.objects.select_for_update().get_or_create(
+                user_low_id=user_low_id,
+                user_high_id=user_high_id,
+                defaults={"last_activity": message.timestamp},
+            )
+            if conversation.last_message_id is None or message.timestamp >= conversation.last_activity:
+                conversation.last_message = message
+                conversation.last_activity = message.timestamp
+            setattr(conversation, unread_field, getattr(conversation, unread_field) + 1)
+            conversation.save()
+        return conversation
+
+    @classmethod
+    def mark_read(cls, reader_id, other_user_id, count):
+        """Take ``count`` messages off the reader's unread counter for the pair."""
+        user_low_id, user_high_id = cls.normalize(reader_id, other_user_id)
+        unread_field = cls.unread_field(reader_id, user_low_id)
+        return cls.objects.filter(user_low_id=user_low_id, user_high_id=user_high_id).update(
+            **{unread_field: Greatest(F(unread_field) - count, 0)}
+        )
+
+    @classmethod
+    def refresh(cls, user_id_a, user_id_b):
+        """
+        Recompute the pair's last message and unread counters from its
+        messages, for changes record_message does not cover (edits, deletes).
+        The conversation is removed once no message is left.
+        """
+        if user_id_a == user_id_b:
+            return None
+
+        user_low_id, user_high_id = cls.normalize(user_id_a, user_id_b)
+        pair = {"user_low_id": user_low_id, "user_high_id": user_high_id}
+        messages = Message.objects.filter(
+            Q(sender_id=user_low_id, receiver_id=user_high_id)
+            | Q(sender_id=user_high_id, receiver_id=user_low_id)
+        )
+        last_message = messages.order_by("-timestamp", "-message_id").first()
+        if last_message is None:
+            cls.objects.filter(**pair).delete()
+            return None
+
+        unread = dict(
+            messages.filter(is_read=False)
+            .values_list("receiver_id")
+            .annotate(count=Count("message_id"))
+            .order_by()
+        )
+        conversation, _ = cls.objects.update_or_create(
+            **pair,
+            defaults={
+                "last_message": last_message,
+                "last_activity": last_message.timestamp,
+                "unread_low": unread.get(user_low_id, 0),
+                "unread_high": unread.get(user_high_id, 0),
+            },
+        )
+        return conversation
@@ -0,0 +1,93 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(message):
+    """Opaque cursor for a message position: base64 of "<timestamp>|<message_id>"."""
+    raw = f"{message.timestamp.isoformat()}|{message.message_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp, message_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(timestamp), int(message_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValidationError({"limit": "A valid integer is required."})
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def paginate_messages(queryset, params):
+    """
+    Keyset pagination over (timestamp, message_id).
+
+    - no cursor: the latest ``limit`` messages
+    - ``before=<cursor>``: the ``limit`` messages right before the cursor
+    - ``after=<cursor>``: the first ``limit`` messages after the cursor
+    - ``since=<ISO timestamp>``: the first ``limit`` messages newer than it
+
+    Returns (messages in chronological order, previous cursor, next cursor).
+    ``previous`` is only set when older messages exist; ``next`` is the
+    position to poll from with ``after``.
+    """
+    limit = parse_limit(params.get("limit"))
+    before, after, since = params.get("before"), params.get("after"), params.get("since")
+
+    if after or since:
+        conversation = queryset
+        if after:
+            timestamp, message_id = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, message_id__gt=message_id)
+            )
+        else:
+            try:
+                timestamp = parse_datetime(since)
+            except ValueError:
+                # Well formed but out of range, e.g. month 13
+                timestamp = None
+            if timestamp is None:
+                raise ValidationError({"since": "A valid ISO 8601 timestamp is required."})
+            queryset = queryset.filter(timestamp__gt=timestamp)
+
+        page = list(queryset.order_by("timestamp", "message_id")[:limit])
+        # Only when something precedes the page, as in the backward branch
+        has_older = bool(page) and conversation.filter(
+            Q(timestamp__lt=page[0].timestamp) | Q(timestamp=page[0].timestamp, message_id__lt=page[0].message_id)
+        ).exists()
+        previous_cursor = encode_cursor(page[0]) if has_older else None
+        next_cursor = encode_cursor(page[-1]) if page else after
+        return page, previous_cursor, next_cursor
+
+    if before:
+        timestamp, message_id = decode_cursor(before)
+        queryset = queryset.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, message_id__lt=message_id)
+        )
+
+    page = list(queryset.order_by("-timestamp", "-message_id")[:limit + 1])
+    has_older = len(page) > limit
+    page = page[:limit]
+    page.reverse()
+
+    previous_cursor = encode_cursor(page[0]) if page and has_older else None
+    next_cursor = encode_cursor(page[-1]) if page else None
+    return page, previous_cursor, next_cursor
@@ -1,3 +1,44 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import User
+from .models import Message
+from .pagination import encode_cursor, paginate_messages
+
+
+class PaginateMessagesTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(email="alice@example.com", password="pw12345!", username="alice")
+        self.bob = User.objects.create_user(email="bob@example.com", password="pw12345!", username="bob")
+        start = timezone.now() - timedelta(hours=1)
+        self.messages = [
+            Message.objects.create(sender=self.alice, receiver=self.bob, content=f"Hello {i}", timestamp=start + timedelta(minutes=i))
+            for i in range(5)
+        ]
+        self.queryset = Message.objects.all()
+
+    def test_backward_pages(self):
+        page, previous_cursor, _ = paginate_messages(self.queryset, {"limit": "2"})
+        self.assertEqual(page, self.messages[3:])
+        self.assertEqual(previous_cursor, encode_cursor(self.messages[3]))
+
+        page, previous_cursor, _ = paginate_messages(self.queryset, {"limit": "3", "before": previous_cursor})
+        self.assertEqual(page, self.messages[:3])
+        self.assertIsNone(previous_cursor)
+
+    def test_forward_pages_set_previous_only_when_older_messages_exist(self):
+        since = (self.messages[0].timestamp - timedelta(minutes=1)).isoformat()
+        page, previous_cursor, next_cursor = paginate_messages(self.queryset, {"limit": "2", "since": since})
+        self.assertEqual(page, self.messages[:2])
+        self.assertIsNone(previous_cursor)
+
+        page, previous_cursor, _ = paginate_messages(self.queryset, {"limit": "2", "after": next_cursor})
+        self.assertEqual(page, self.messages[2:4])
+        self.assertEqual(previous_cursor, encode_cursor(self.messages[2]))
 
-# Create your tests here.
+    def test_rejects_impossible_since(self):
+        with self.assertRaises(ValidationError):
+            paginate_messages(self.queryset, {"since": "2024-13-45T00:00:00"})
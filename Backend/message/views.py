@@ -1,8 +1,14 @@
+from collections import defaultdict
+
 from rest_framework import viewsets, permissions, decorators, response, status
-from django.db.models import Q, Max, Count, Case, When, IntegerField
-from .models import Message
+from rest_framework.exceptions import PermissionDenied
+from django.db import transaction
+from django.db.models import Q
+from .models import Message, Conversation
 from .serializers import MessageSerializer, ConversationSerializer
-from accounts.models import User
+from .pagination import paginate_messages
+from notification import counters
+from accounts import privacy
 
 
 class MessageViewSet(viewsets.ModelViewSet):
@@ -12,18 +18,50 @@ class MessageViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
         # All messages sent OR received by the user
-        return Message.objects.filter(Q(sender=user) | Q(receiver=user)).order_by("timestamp")
+        return Message.objects.involving(user).order_by("timestamp")
 
     def perform_create(self, serializer):
-        serializer.save(sender=self.request.user)
+        receiver = serializer.validated_data["receiver"]
+        if not privacy.can_contact(self.request.user.user_id, receiver.user_id):
+            raise PermissionDenied(privacy.contact_refusal(receiver.user_id))
+        with transaction.atomic():
+            message = serializer.save(sender=self.request.user)
+            Conversation.record_message(message)
+
+    def perform_update(self, serializer):
+        before = serializer.instance
+        old_pair, was_unread = (before.sender_id, before.receiver_id), self.counts_as_unread(before)
+        with transaction.atomic():
+            message = serializer.save()
+            Conversation.refresh(*old_pair)
+            if (message.sender_id, message.receiver_id) != old_pair:
+                Conversation.refresh(message.sender_id, message.receiver_id)
+            deltas = defaultdict(int)
+            deltas[old_pair[1]] -= int(was_unread)
+            deltas[message.receiver_id] += int(self.counts_as_unread(message))
+            counters.adjust("messages", deltas)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            Conversation.refresh(instance.sender_id, instance.receiver_id)
+            if self.counts_as_unread(instance):
+                counters.adjust("messages", {instance.receiver_id: -1})
+
+    @staticmethod
+    def counts_as_unread(message):
+        """Whether the message is part of its receiver's unread counter"""
+        return not message.is_read and message.sender_id != message.receiver_id
 
     @decorators.action(detail=False, methods=["get"], url_path="conversation/(?P<user_id>[^/.]+)")
     def get_conversation(self, request, user_id=None):
         """
         Custom endpoint:
         GET /api/v1/messages/conversation/<user_id>/
-        Returns all messages between the logged-in user and the given user.
-        Marks messages as read.
+        Returns one page of messages between the logged-in user and the given user.
+        Query params: limit, before=<cursor> (older history), after=<cursor> or
+        since=<ISO timestamp> (new messages only, for polling).
+        Marks the delivered messages as read.
         """
         current_user = request.user
 
@@ -31,13 +69,29 @@ class MessageViewSet(viewsets.ModelViewSet):
         messages = Message.objects.filter(
             Q(sender=current_user, receiver__user_id=user_id)
             | Q(sender__user_id=user_id, receiver=current_user)
-        ).order_by("timestamp")
+        ).select_related("sender", "receiver")
 
-        # Mark unread messages as read
-        messages.filter(receiver=current_user, is_read=False).update(is_read=True)
+        page, previous_cursor, next_cursor = paginate_messages(messages, request.query_params)
 
-        serializer = self.get_serializer(messages, many=True)
-        return response.Response(serializer.data, status=status.HTTP_200_OK)
+        # Mark unread messages in this page as read
+        unread = [msg for msg in page if msg.receiver_id == current_user.user_id and not msg.is_read]
+        if unread:
+            with transaction.atomic():
+                marked = Message.objects.filter(
+                    message_id__in=[msg.message_id for msg in unread], is_read=False
+                ).update(is_read=True)
+                if marked:
+                    Conversation.mark_read(current_user.user_id, int(user_id), marked)
+                    counters.adjust("messages", {current_user.user_id: -marked})
+            for msg in unread:
+                msg.is_read = True
+
+        serializer = self.get_serializer(page, many=True)
+        return response.Response({
+            "results": serializer.data,
+            "previous": previous_cursor,
+            "next": next_cursor,
+        }, status=status.HTTP_200_OK)
 
     @decorators.action(detail=False, methods=["get"], url_path="conversations")
     def get_conversations(self, request):
@@ -47,50 +101,16 @@ class MessageViewSet(viewsets.ModelViewSet):
         Returns a list of all conversations (chat summaries) for the current user.
         Each conversation includes: other user details, last message, unread count.
         """
-        current_user = request.user
-
-        # Get all users the current user has conversed with
-        user_messages = Message.objects.filter(Q(sender=current_user) | Q(receiver=current_user))
-        
-        # Get unique user IDs (excluding current user)
-        other_user_ids = set()
-        for msg in user_messages:
-            if msg.sender.user_id != current_user.user_id:
-                other_user_ids.add(msg.sender.user_id)
-            if msg.receiver.user_id != current_user.user_id:
-                other_user_ids.add(msg.receiver.user_id)
-
-        conversations = []
-        for other_user_id in other_user_ids:
-            try:
-                other_user = User.objects.get(user_id=other_user_id)
-                
-                # Get conversation messages
-                conversation_messages = Message.objects.filter(
-                    Q(sender=current_user, receiver=other_user)
-                    | Q(sender=other_user, receiver=current_user)
-                ).order_by("-timestamp")
-
-                if conversation_messages.exists():
-                    last_message = conversation_messages.first()
-                    
-                    # Count unread messages from the other user
-                    unread_count = conversation_messages.filter(
-                        sender=other_user,
-                        receiver=current_user,
-                        is_read=False
-                    ).count()
-
-                    conversations.append({
-                        "other_user": other_user,
-                        "last_message": last_message,
-                        "unread_count": unread_count,
-                    })
-            except User.DoesNotExist:
-                continue
-
-        # Sort by last message timestamp
-        conversations.sort(key=lambda x: x["last_message"].timestamp, reverse=True)
-
+        conversations = Conversation.objects.summaries(request.user)
         serializer = ConversationSerializer(conversations, many=True)
         return response.Response(serializer.data, status=status.HTTP_200_OK)
+
+    @decorators.action(detail=False, methods=["get"], url_path="unread_count")
+    def unread_count(self, request):
+        """
+        Custom endpoint:
+        GET /api/v1/messages/unread_count/
+        Returns the number of unread messages received by the current user.
+        """
+        counter = counters.get_counter(request.user.user_id)
+        return response.Response({"unread_count": counter.messages}, status=status.HTTP_200_OK)
@@ -0,0 +1,158 @@
+"""
+Fan-out of real-time events (new messages, new notifications) to the
+clients connected to the push stream.
+
+The broker is chosen with the ``REALTIME_BROKER`` setting (dotted path).
+``InProcessBroker`` only reaches subscribers living in the same process:
+events published elsewhere, such as by the ``process_notification_outbox``
+worker or another server process, are lost. ``RedisBroker`` publishes
+through Redis pub/sub and is the default when ``REDIS_URL`` is set.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class BaseSubscription:
+    async def get(self, timeout=None):
+        """Wait for the next event; return None if ``timeout`` seconds pass first."""
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class BaseBroker:
+    # Whether events published in one process reach subscribers in the others
+    cross_process = False
+
+    def publish(self, user_id, event):
+        """Deliver ``event`` (a JSON-serializable dict) to every stream of ``user_id``."""
+        raise NotImplementedError
+
+    def subscribe(self, user_id):
+        """Open a subscription for ``user_id``; must be called from the event loop."""
+        raise NotImplementedError
+
+
+class InProcessSubscription(BaseSubscription):
+    def __init__(self, broker, user_id, max_queue_size):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+
+    def deliver(self, event):
+        # Slow consumers drop events rather than growing without bound
+        if not self.queue.full():
+            self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker(BaseBroker):
+    max_queue_size = 100
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def publish(self, user_id, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            # publish() runs in request threads, the queues belong to the event loop
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Loop already closed; the subscription is going away
+                pass
+
+    def subscribe(self, user_id):
+        subscription = InProcessSubscription(self, user_id, self.max_queue_size)
+        with self.lock:
+            self.subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.user_id]
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Publishes every event to a per-user Redis channel. Each process keeps
+    its subscriptions in memory as InProcessBroker does, and one listener
+    thread, started with the first subscription, pattern-subscribes to all
+    user channels and hands their events to the local subscriptions.
+    """
+    cross_process = True
+    channel_prefix = "realtime:user:"
+    reconnect_seconds = 1.0
+
+    def __init__(self, url=None):
+        import redis
+
+        super().__init__()
+        self.redis = redis.Redis.from_url(url or settings.REALTIME_BROKER_URL, decode_responses=True)
+        self.listener = None
+
+    def publish(self, user_id, event):
+        self.redis.publish(f"{self.channel_prefix}{user_id}", json.dumps(event, cls=DjangoJSONEncoder))
+
+    def subscribe(self, user_id):
+        subscription = super().subscribe(user_id)
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, name="realtime-broker", daemon=True)
+                self.listener.start()
+        return subscription
+
+    def listen(self):
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(f"{self.channel_prefix}*")
+                for message in pubsub.listen():
+                    user_id = int(message["channel"][len(self.channel_prefix):])
+                    super().publish(user_id, json.loads(message["data"]))
+            except Exception:
+                # Events sent while disconnected are lost; streams carry on once reconnected
+                logger.exception("Realtime broker lost its Redis subscription; reconnecting")
+                time.sleep(self.reconnect_seconds)
+            finally:
+                pubsub.close()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                backend = getattr(settings, "REALTIME_BROKER", "notification.broker.InProcessBroker")
+                _broker = import_string(backend)()
+    return _broker
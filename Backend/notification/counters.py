@@ -0,0 +1,74 @@
+"""
+Maintained unread counters for notifications and messages.
+
+Rows are created lazily: the first read for a user seeds the row from
+the real counts, and adjustments only touch rows that already exist, so
+a missing row can never hold a stale total.
+"""
+from collections import defaultdict
+
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from message.models import Message
+from .models import Notification, UnreadCounter
+
+
+def count_unread(user_ids):
+    """Actual unread totals for the given users: {user_id: (notifications, messages)}."""
+    notifications = dict(
+        Notification.objects.filter(user_id__in=user_ids, is_read=False)
+        .values_list("user_id")
+        .annotate(count=Count("notification_id"))
+        .order_by()
+    )
+    messages = dict(
+        Message.objects.filter(receiver_id__in=user_ids, is_read=False)
+        .exclude(sender=F("receiver"))
+        .values_list("receiver_id")
+        .annotate(count=Count("message_id"))
+        .order_by()
+    )
+    return {
+        user_id: (notifications.get(user_id, 0), messages.get(user_id, 0))
+        for user_id in user_ids
+    }
+
+
+def get_counter(user_id):
+    counter = UnreadCounter.objects.filter(user_id=user_id).first()
+    if counter is None:
+        notifications, messages = count_unread([user_id])[user_id]
+        counter, _ = UnreadCounter.objects.get_or_create(
+            user_id=user_id,
+            defaults={"notifications": notifications, "messages": messages},
+        )
+    return counter
+
+
+def adjust(field, deltas):
+    """
+    Add ``deltas`` ({user_id: n}, n may be negative) to a counter column,
+    floored at zero. Runs one UPDATE per distinct delta value.
+    """
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+
+    for delta, user_ids in by_delta.items():
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(
+            **{field: Greatest(F(field) + delta, 0)}
+        )
+
+
+def reset(field, user_id):
+    UnreadCounter.objects.filter(user_id=user_id).update(**{field: 0})
+
+
+def notifications_created(notifications):
+    deltas = defaultdict(int)
+    for notification in notifications:
+        if not notification.is_read:
+            deltas[notification.user_id] += 1
+    adjust("notifications", deltas)
@@ -0,0 +1,80 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from accounts.models import User
+from notification.models import Notification
+from notification.retention import archive_read, prune_expired
+from notification.views import NotificationViewSet
+
+
+class Command(BaseCommand):
+    help = 'Seed a throwaway notification dataset and time the feed before and after retention runs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Number of seeded users')
+        parser.add_argument('--per-user', type=int, default=5000, help='Notifications seeded per user')
+        parser.add_argument('--days', type=int, default=365, help='Seeded notifications span this many days')
+        parser.add_argument('--archive-days', type=int, default=30, help='Archive read notifications older than this')
+        parser.add_argument('--repeat', type=int, default=5, help='Feed requests timed per user')
+
+    def handle(self, *args, **options):
+        # Everything happens in one transaction that is rolled back at the end
+        with transaction.atomic():
+            users = self.seed(options)
+            before = self.measure(users, options['repeat'])
+
+            started = time.perf_counter()
+            archived = archive_read(options['archive_days'])
+            pruned = sum(prune_expired().values())
+            retention_seconds = time.perf_counter() - started
+
+            after = self.measure(users, options['repeat'])
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'Seeded {len(users) * options["per_user"]} notifications for {len(users)} users')
+        self.stdout.write(f'Retention archived {archived} and pruned {pruned} rows in {retention_seconds:.2f}s')
+        self.stdout.write(f'Feed latency before: median {before[0]:.1f} ms, p95 {before[1]:.1f} ms')
+        self.stdout.write(f'Feed latency after:  median {after[0]:.1f} ms, p95 {after[1]:.1f} ms')
+
+    def seed(self, options):
+        now = timezone.now()
+        types = [notification_type for notification_type, _ in Notification.NOTIFICATION_TYPES]
+        stamp = int(now.timestamp())
+        users = User.objects.bulk_create([
+            User(email=f'benchmark-{stamp}-{i}@example.com', username=f'benchmark_{i}')
+            for i in range(options['users'])
+        ])
+        span = options['days'] * 24 * 3600
+        for user in users:
+            Notification.objects.bulk_create([
+                Notification(
+                    user=user,
+                    type=random.choice(types),
+                    message_text='Benchmark notification',
+                    timestamp=now - timedelta(seconds=random.randint(0, span)),
+                    is_read=random.random() < 0.8,
+                )
+                for _ in range(options['per_user'])
+            ], batch_size=1000)
+        return users
+
+    def measure(self, users, repeat):
+        factory = APIRequestFactory()
+        view = NotificationViewSet.as_view({'get': 'list'})
+        timings = []
+        for user in users:
+            for _ in range(repeat):
+                request = factory.get('/api/v1/notifications/')
+                force_authenticate(request, user=user)
+                started = time.perf_counter()
+                response = view(request)
+                response.render()
+                timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        return statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
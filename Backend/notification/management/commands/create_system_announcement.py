@@ -1,4 +1,7 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from notification import counters
 from notification.models import Notification
 from accounts.models import User
 
@@ -13,29 +16,64 @@ class Command(BaseCommand):
             default='Welcome to Swapo! Start trading skills with other users today.',
             help='The message for the system announcement'
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of users checked and notified per batch'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many users would be notified without writing anything'
+        )
 
     def handle(self, *args, **options):
         message = options['message']
-        users = User.objects.all()
-        
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        # Users that do not have this announcement yet (anti-join)
+        already_announced = Notification.objects.filter(
+            user=OuterRef('pk'),
+            type='system_alert',
+            message_text=message
+        )
+        pending_users = User.objects.exclude(Exists(already_announced)).order_by('user_id')
+
+        total = pending_users.count()
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(f'Dry run: {total} system announcement notifications would be created')
+            )
+            return
+
         created_count = 0
-        for user in users:
-            # Check if user already has this system announcement
-            existing = Notification.objects.filter(
-                user=user,
-                type='system_alert',
-                message_text=message
-            ).exists()
-            
-            if not existing:
-                Notification.objects.create(
-                    user=user,
-                    type='system_alert',
-                    message_text=message,
-                    is_read=False
-                )
-                created_count += 1
-        
+        last_user_id = 0
+        while True:
+            # Stream recipient IDs by keyset so only one batch is held in memory
+            user_ids = list(
+                pending_users.filter(user_id__gt=last_user_id)
+                .values_list('user_id', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+
+            with transaction.atomic():
+                notifications = Notification.objects.bulk_create([
+                    Notification(
+                        user_id=user_id,
+                        type='system_alert',
+                        message_text=message,
+                        is_read=False
+                    )
+                    for user_id in user_ids
+                ])
+                counters.notifications_created(notifications)
+            created_count += len(user_ids)
+            self.stdout.write(f'Created {created_count}/{total} notifications')
+
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {created_count} system announcement notifications')
         )
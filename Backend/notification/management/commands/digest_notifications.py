@@ -0,0 +1,116 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from notification import counters
+from notification.models import Notification
+
+# Ids per DELETE, within SQLite's limit on query parameters
+DELETE_BATCH_SIZE = 500
+
+class Command(BaseCommand):
+    help = 'Roll old unread notifications into one digest notification per user'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-hours',
+            type=int,
+            default=72,
+            help='Only unread notifications older than this are rolled up'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of users digested per transaction'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many notifications would be rolled up without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['older_than_hours'])
+        batch_size = options['batch_size']
+        labels = dict(Notification.NOTIFICATION_TYPES)
+
+        stale = Notification.objects.filter(is_read=False, timestamp__lt=cutoff).exclude(type='digest')
+
+        if options['dry_run']:
+            summary = stale.aggregate(rows=Count('notification_id'), users=Count('user_id', distinct=True))
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Dry run: {summary["rows"]} notifications of {summary["users"]} users would be digested'
+                )
+            )
+            return
+
+        user_ids = list(stale.values_list('user_id', flat=True).distinct().order_by('user_id'))
+        digested = users = 0
+        for start in range(0, len(user_ids), batch_size):
+            chunk = user_ids[start:start + batch_size]
+            with transaction.atomic():
+                # Count what is actually rolled up: the rows are locked, so none is read or deleted meanwhile
+                rows = list(
+                    stale.filter(user_id__in=chunk).select_for_update()
+                    .values_list('notification_id', 'user_id', 'type', 'count')
+                )
+                # {user_id: {type: number of events}} and {user_id: number of rows}
+                totals = defaultdict(lambda: defaultdict(int))
+                row_counts = defaultdict(int)
+                for _, user_id, notification_type, events in rows:
+                    totals[user_id][notification_type] += events
+                    row_counts[user_id] += 1
+
+                notification_ids = [row[0] for row in rows]
+                for offset in range(0, len(notification_ids), DELETE_BATCH_SIZE):
+                    Notification.objects.filter(
+                        notification_id__in=notification_ids[offset:offset + DELETE_BATCH_SIZE]
+                    ).delete()
+                # Users whose stale rows were all read meanwhile get no digest
+                chunk = list(totals)
+                users += len(chunk)
+                existing = {
+                    digest.user_id: digest
+                    for digest in Notification.objects.select_for_update().filter(
+                        user_id__in=chunk, type='digest', is_read=False
+                    )
+                }
+
+                created, updated = [], []
+                # The rolled-up rows leave the unread badge, new digests join it
+                deltas = {user_id: -row_counts[user_id] for user_id in chunk}
+                for user_id in chunk:
+                    events = sum(totals[user_id].values())
+                    digest = existing.get(user_id)
+                    if digest is None:
+                        summary = ', '.join(
+                            f'{labels.get(notification_type, notification_type)} ({count})'
+                            for notification_type, count in sorted(totals[user_id].items())
+                        )
+                        created.append(Notification(
+                            user_id=user_id,
+                            type='digest',
+                            count=events,
+                            message_text=f'While you were away: {summary}',
+                            link_url='/app/dashboard'
+                        ))
+                        deltas[user_id] += 1
+                    else:
+                        digest.count += events
+                        digest.message_text = f'While you were away: {digest.count} updates'
+                        digest.timestamp = timezone.now()
+                        updated.append(digest)
+
+                Notification.objects.bulk_create(created)
+                Notification.objects.bulk_update(updated, ['count', 'message_text', 'timestamp'])
+                counters.adjust('notifications', deltas)
+            digested += len(rows)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully digested {digested} notifications for {users} users')
+        )
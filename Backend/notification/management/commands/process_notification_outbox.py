@@ -0,0 +1,61 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from notification.broker import get_broker
+from notification.outbox import process_batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Render queued notification events into notifications (runs as a background worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of outbox events rendered per transaction'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to sleep when the outbox is empty'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the outbox and exit instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        if not get_broker().cross_process:
+            self.stderr.write(self.style.WARNING(
+                'REALTIME_BROKER only reaches streams in this process: notifications rendered here '
+                'will not be pushed to connected clients. Set REDIS_URL or REALTIME_BROKER.'
+            ))
+
+        while True:
+            try:
+                processed = process_batch(batch_size)
+            except Exception:
+                logger.exception('Failed to process notification outbox batch')
+                processed = 0
+                if options['once']:
+                    raise
+
+            total += processed
+            if processed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Successfully processed {total} notification events')
+        )
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from notification.retention import prune_expired, archive_read
+
+
+class Command(BaseCommand):
+    help = 'Delete notifications past their retention period and optionally archive old read ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rows deleted per transaction'
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0,
+            help='Seconds to sleep between batches to leave room for other writers'
+        )
+        parser.add_argument(
+            '--archive-days',
+            type=int,
+            help='Move read notifications older than this many days out of the live table first'
+        )
+        parser.add_argument(
+            '--export',
+            type=str,
+            help='Append archived notifications to this JSONL file'
+        )
+        parser.add_argument(
+            '--no-archive-table',
+            action='store_true',
+            help='With --export, do not also copy archived rows into the archive table'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many rows would be archived or deleted without changing anything'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pause = options['pause']
+        dry_run = options['dry_run']
+
+        if options['export'] and options['archive_days'] is None:
+            raise CommandError('--export requires --archive-days')
+
+        if options['archive_days'] is not None:
+            to_table = not (options['no_archive_table'] and options['export'])
+            if options['export'] and not dry_run:
+                with open(options['export'], 'a') as export_file:
+                    archived = archive_read(options['archive_days'], batch_size, pause, to_table, export_file)
+            else:
+                archived = archive_read(options['archive_days'], batch_size, pause, to_table, dry_run=dry_run)
+            self.stdout.write(f'{"Would archive" if dry_run else "Archived"} {archived} read notifications')
+
+        results = prune_expired(batch_size, pause, dry_run)
+        for notification_type, count in results.items():
+            if count:
+                self.stdout.write(f'{"Would delete" if dry_run else "Deleted"} {count} expired {notification_type} notifications')
+
+        total = sum(results.values())
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'Dry run: {total} notifications would be pruned'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Successfully pruned {total} notifications'))
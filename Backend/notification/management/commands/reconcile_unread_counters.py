@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from notification.counters import count_unread
+from notification.models import UnreadCounter
+from accounts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Recompute unread notification/message counters and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of users recounted per batch'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted counters without fixing them'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        checked_count = 0
+        repaired_count = 0
+        last_user_id = 0
+        while True:
+            user_ids = list(
+                User.objects.filter(user_id__gt=last_user_id)
+                .order_by('user_id')
+                .values_list('user_id', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            last_user_id = user_ids[-1]
+            checked_count += len(user_ids)
+
+            actual = count_unread(user_ids)
+            stored = {
+                counter.user_id: (counter.notifications, counter.messages)
+                for counter in UnreadCounter.objects.filter(user_id__in=user_ids)
+            }
+            drifted = [
+                UnreadCounter(user_id=user_id, notifications=notifications, messages=messages)
+                for user_id, (notifications, messages) in actual.items()
+                if user_id in stored and stored[user_id] != (notifications, messages)
+            ]
+            repaired_count += len(drifted)
+
+            if drifted and not dry_run:
+                with transaction.atomic():
+                    UnreadCounter.objects.bulk_update(drifted, ['notifications', 'messages'])
+
+        verb = 'would repair' if dry_run else 'repaired'
+        self.stdout.write(
+            self.style.SUCCESS(f'Checked {checked_count} users, {verb} {repaired_count} drifted counters')
+        )
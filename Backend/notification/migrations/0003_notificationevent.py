@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0002_alter_notification_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('event_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(choices=[('message_created', 'Message Created'), ('proposal_created', 'Proposal Created'), ('proposal_accepted', 'Proposal Accepted'), ('trade_created', 'Trade Created'), ('trade_status_changed', 'Trade Status Changed')], max_length=30)),
+                ('object_id', models.PositiveIntegerField()),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message', '0003_conversation'),
+        ('notification', '0004_unreadcounter'),
+        ('trade', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-timestamp'], name='notificatio_user_id_8c0772_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notification', '0006_notification_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('notification_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('type', models.CharField(choices=[('new_message', 'New Message'), ('trade_proposal', 'Trade Proposal'), ('trade_accepted', 'Trade Accepted'), ('trade_active', 'Active Trade'), ('trade_completed', 'Trade Completed'), ('system_alert', 'System Alert'), ('digest', 'Digest')], max_length=50)),
+                ('message_text', models.TextField()),
+                ('link_url', models.CharField(blank=True, max_length=255, null=True)),
+                ('count', models.PositiveIntegerField(default=1)),
+                ('timestamp', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-timestamp'], name='notificatio_user_id_283d0e_idx')],
+            },
+        ),
+    ]
@@ -1,5 +1,4 @@
 from django.db import models
-from django.db import models
 from django.utils import timezone
 from accounts.models import User
 from trade.models import Trade, TradeProposal
@@ -14,6 +13,7 @@ class Notification(models.Model):
         ("trade_active", "Active Trade"),
         ("trade_completed", "Trade Completed"),
         ("system_alert", "System Alert"),
+        ("digest", "Digest"),
     ]
 
     notification_id = models.AutoField(primary_key=True)
@@ -28,6 +28,75 @@ class Notification(models.Model):
     timestamp = models.DateTimeField(default=timezone.now)
     is_read = models.BooleanField(default=False)
     link_url = models.CharField(max_length=255, blank=True, null=True)
+    # Number of events folded into this row (coalesced messages, digests)
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-timestamp"]),
+        ]
 
     def __str__(self):
         return f"Notification {self.notification_id} for {self.user} - {self.type}"
+
+
+class NotificationEvent(models.Model):
+    """
+    Outbox row appended by the signal handlers in the same transaction as
+    the change that caused it. `process_notification_outbox` renders the
+    rows into Notifications in batches and deletes them.
+    """
+    EVENT_TYPES = [
+        ("message_created", "Message Created"),
+        ("proposal_created", "Proposal Created"),
+        ("proposal_accepted", "Proposal Accepted"),
+        ("trade_created", "Trade Created"),
+        ("trade_status_changed", "Trade Status Changed"),
+    ]
+
+    event_id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=30, choices=EVENT_TYPES)
+    object_id = models.PositiveIntegerField()
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Event {self.event_id}: {self.event_type} #{self.object_id}"
+
+
+class UnreadCounter(models.Model):
+    """
+    Per-user unread totals kept in step with the writes (see counters.py)
+    so unread badges are a primary-key lookup instead of a COUNT(*).
+    `reconcile_unread_counters` repairs any drift.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name="unread_counter")
+    notifications = models.PositiveIntegerField(default=0)
+    messages = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Unread counters for {self.user}"
+
+
+class NotificationArchive(models.Model):
+    """
+    Compact copy of a read notification moved out of the live table by
+    `prune_notifications --archive-days`. Relations to messages, proposals
+    and trades are dropped; only what is needed to show history is kept.
+    """
+    notification_id = models.IntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_notifications")
+    type = models.CharField(max_length=50, choices=Notification.NOTIFICATION_TYPES)
+    message_text = models.TextField()
+    link_url = models.CharField(max_length=255, blank=True, null=True)
+    count = models.PositiveIntegerField(default=1)
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-timestamp"]),
+        ]
+
+    def __str__(self):
+        return f"Archived notification {self.notification_id} for {self.user} - {self.type}"
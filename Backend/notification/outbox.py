@@ -0,0 +1,225 @@
+"""
+Renders queued NotificationEvent rows into Notifications.
+
+The signal handlers only append a compact outbox row inside the request
+transaction; this module turns a batch of rows into Notification rows
+with one query per event type, a single bulk_create (plus a bulk_update for
+coalesced rows) and a single delete.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+
+from message.models import Message
+from trade.models import TradeProposal, Trade
+from . import counters
+from .models import Notification, NotificationEvent
+from .serializers import NotificationSerializer
+from .signals import publish_event
+
+logger = logging.getLogger(__name__)
+
+
+def display_name(user):
+    return f"{user.first_name} {user.last_name}" if user.first_name else user.username
+
+
+def message_text(count, sender):
+    if count == 1:
+        return f"New message from {sender.username}"
+    return f"{count} new messages from {sender.username}"
+
+
+def render_messages(events):
+    """
+    Coalesce message notifications: an unread new_message notification
+    from the same sender is updated in place (count and latest message)
+    instead of adding a row per message.
+    """
+    messages = Message.objects.select_related("sender").in_bulk([e.object_id for e in events])
+
+    # Latest message and message count per (receiver, sender) pair
+    bursts = {}
+    for event in events:
+        message = messages.get(event.object_id)
+        if message is None:
+            continue
+        key = (message.receiver_id, message.sender_id)
+        latest, count = bursts.get(key, (message, 0))
+        if message.timestamp >= latest.timestamp:
+            latest = message
+        bursts[key] = (latest, count + 1)
+
+    if not bursts:
+        return
+
+    unread = (
+        Notification.objects.filter(
+            type="new_message",
+            is_read=False,
+            user_id__in={receiver_id for receiver_id, _ in bursts},
+            message__sender_id__in={sender_id for _, sender_id in bursts},
+        )
+        .select_related("message__sender")
+        .order_by("timestamp")
+    )
+    existing = {(n.user_id, n.message.sender_id): n for n in unread}
+
+    for key, (message, count) in bursts.items():
+        notification = existing.get(key)
+        if notification is None:
+            notification = Notification(
+                user_id=message.receiver_id,
+                type="new_message",
+                link_url="/app/dashboard/messages",
+                count=0,
+            )
+        notification.count += count
+        notification.message = message
+        notification.message_text = message_text(notification.count, message.sender)
+        notification.timestamp = message.timestamp
+        yield notification
+
+
+def render_proposals_created(events):
+    proposals = TradeProposal.objects.select_related(
+        "proposer", "skill_offered_by_proposer", "skill_desired_by_proposer"
+    ).in_bulk([e.object_id for e in events])
+    for event in events:
+        proposal = proposals.get(event.object_id)
+        if proposal is None:
+            continue
+        yield Notification(
+            user_id=proposal.recipient_id,
+            proposal=proposal,
+            type="trade_proposal",
+            message_text=f"{display_name(proposal.proposer)} proposed a trade: {proposal.skill_offered_by_proposer.skill_name} for {proposal.skill_desired_by_proposer.skill_name}",
+            link_url=f"/app/dashboard/proposal/{proposal.proposal_id}"
+        )
+
+
+def render_proposals_accepted(events):
+    proposals = TradeProposal.objects.select_related("proposer", "recipient").in_bulk(
+        [e.object_id for e in events]
+    )
+    for event in events:
+        proposal = proposals.get(event.object_id)
+        if proposal is None:
+            continue
+        yield Notification(
+            user_id=proposal.proposer_id,
+            proposal=proposal,
+            type="trade_accepted",
+            message_text=f"{display_name(proposal.recipient).title()} accepted your trade proposal!",
+            link_url=f"/app/dashboard/proposal/{proposal.proposal_id}"
+        )
+
+
+def load_trades(events):
+    return Trade.objects.select_related("user1", "user2", "skill1", "skill2").in_bulk(
+        [e.object_id for e in events]
+    )
+
+
+def render_trades_created(events):
+    trades = load_trades(events)
+    for event in events:
+        trade = trades.get(event.object_id)
+        if trade is None:
+            continue
+        skills = f"{trade.skill1.skill_name} ↔ {trade.skill2.skill_name}"
+        for user, other in ((trade.user2, trade.user1), (trade.user1, trade.user2)):
+            yield Notification(
+                user=user,
+                trade=trade,
+                type="trade_accepted",
+                message_text=f"Trade started with {display_name(other)}: {skills}",
+                link_url=f"/app/dashboard/trade/{trade.trade_id}"
+            )
+
+
+def render_trade_status_changes(events):
+    trades = load_trades(events)
+    # Only one trade_active notification per user and trade
+    notified = set(
+        Notification.objects.filter(trade_id__in=trades.keys(), type="trade_active")
+        .values_list("user_id", "trade_id")
+    )
+    for event in events:
+        trade = trades.get(event.object_id)
+        if trade is None:
+            continue
+        trade_status = event.payload.get("status", trade.status)
+        skills = f"{trade.skill1.skill_name} ↔ {trade.skill2.skill_name}"
+        for user, other in ((trade.user2, trade.user1), (trade.user1, trade.user2)):
+            if (user.user_id, trade.trade_id) in notified:
+                continue
+            notified.add((user.user_id, trade.trade_id))
+            yield Notification(
+                user=user,
+                trade=trade,
+                type="trade_active",
+                message_text=f"Trade with {display_name(other)} is now {trade_status}: {skills}",
+                link_url=f"/app/dashboard/trade/{trade.trade_id}"
+            )
+
+
+RENDERERS = {
+    "message_created": render_messages,
+    "proposal_created": render_proposals_created,
+    "proposal_accepted": render_proposals_accepted,
+    "trade_created": render_trades_created,
+    "trade_status_changed": render_trade_status_changes,
+}
+
+
+def render(events):
+    by_type = defaultdict(list)
+    for event in events:
+        by_type[event.event_type].append(event)
+
+    notifications = []
+    for event_type, typed_events in by_type.items():
+        renderer = RENDERERS.get(event_type)
+        if renderer is None:
+            logger.warning("Dropping %d outbox events of unknown type %s", len(typed_events), event_type)
+            continue
+        notifications.extend(renderer(typed_events))
+    return notifications
+
+
+COALESCED_FIELDS = ["message", "count", "message_text", "timestamp"]
+
+
+def push(notifications):
+    """Stream freshly created notifications to their owners"""
+    for notification in notifications:
+        publish_event(notification.user_id, "notification", NotificationSerializer(notification).data)
+
+
+def process_batch(batch_size=500):
+    """
+    Render and delete up to ``batch_size`` outbox rows in one transaction.
+    Concurrent workers skip rows locked by each other on PostgreSQL.
+    Returns the number of events consumed.
+    """
+    with transaction.atomic():
+        events = list(
+            NotificationEvent.objects.select_for_update(skip_locked=True)
+            .order_by("event_id")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        rendered = render(events)
+        # Renderers return existing rows (with a pk) when they coalesce into them
+        updated = [n for n in rendered if n.pk is not None]
+        created = Notification.objects.bulk_create([n for n in rendered if n.pk is None])
+        if updated:
+            Notification.objects.bulk_update(updated, COALESCED_FIELDS)
+        NotificationEvent.objects.filter(event_id__in=[e.event_id for e in events]).delete()
+        counters.notifications_created(created)
+        push(created + updated)
+
+    return len(events)
@@ -0,0 +1,99 @@
+"""
+Retention for the Notification table.
+
+Rows are removed in small primary-key batches so no statement holds
+locks on a large range of the table. Expired rows follow the per-type
+TTLs in ``settings.NOTIFICATION_RETENTION_DAYS``; read rows older than a
+given age can be moved to NotificationArchive and/or a JSONL file first.
+"""
+import json
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters
+from .models import Notification, NotificationArchive
+
+
+ARCHIVE_FIELDS = ["notification_id", "user_id", "type", "message_text", "link_url", "count", "timestamp"]
+
+
+def delete_in_batches(queryset, batch_size, pause=0, before_delete=None):
+    """
+    Delete the rows of ``queryset`` ``batch_size`` at a time, each batch
+    in its own short transaction. ``before_delete`` receives the rows
+    (dicts of ARCHIVE_FIELDS plus is_read) of each batch before deletion.
+    Returns the number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                queryset.order_by("notification_id").values(*ARCHIVE_FIELDS, "is_read")[:batch_size]
+            )
+            if not rows:
+                break
+            if before_delete is not None:
+                before_delete(rows)
+
+            Notification.objects.filter(notification_id__in=[row["notification_id"] for row in rows]).delete()
+
+            # Deleted unread rows leave the badge
+            unread = defaultdict(int)
+            for row in rows:
+                if not row["is_read"]:
+                    unread[row["user_id"]] -= 1
+            counters.adjust("notifications", unread)
+
+        deleted += len(rows)
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def expired_queryset(notification_type, days, now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    return Notification.objects.filter(type=notification_type, timestamp__lt=cutoff)
+
+
+def prune_expired(batch_size=1000, pause=0, dry_run=False, now=None):
+    """Delete notifications past their type's TTL. Returns {type: rows}."""
+    results = {}
+    for notification_type, days in getattr(settings, "NOTIFICATION_RETENTION_DAYS", {}).items():
+        queryset = expired_queryset(notification_type, days, now)
+        if dry_run:
+            results[notification_type] = queryset.count()
+        else:
+            results[notification_type] = delete_in_batches(queryset, batch_size, pause)
+    return results
+
+
+def archive_read(older_than_days, batch_size=1000, pause=0, to_table=True, export_file=None,
+                 dry_run=False, now=None):
+    """
+    Move read notifications older than ``older_than_days`` out of the live
+    table: into NotificationArchive when ``to_table`` and/or as JSON lines
+    into ``export_file``. Returns the number of rows moved.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=older_than_days)
+    queryset = Notification.objects.filter(is_read=True, timestamp__lt=cutoff)
+    if dry_run:
+        return queryset.count()
+
+    def archive(rows):
+        if to_table:
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**{field: row[field] for field in ARCHIVE_FIELDS}) for row in rows],
+                ignore_conflicts=True,
+            )
+        if export_file is not None:
+            for row in rows:
+                record = {field: row[field] for field in ARCHIVE_FIELDS}
+                export_file.write(json.dumps(record, cls=DjangoJSONEncoder) + "\n")
+
+    return delete_in_batches(queryset, batch_size, pause, before_delete=archive)
@@ -13,6 +13,14 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ["notification_id", "timestamp"]
 
+    # Relations read by the *_details methods below
+    select_related_fields = ("message__sender", "proposal__proposer", "trade")
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load everything the serializer touches so a page costs a constant number of queries"""
+        return queryset.select_related(*cls.select_related_fields)
+
     def get_sender_details(self, obj):
         # Get sender from message if it's a message notification
         if obj.message and obj.message.sender:
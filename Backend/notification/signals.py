@@ -1,106 +1,63 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from message.models import Message
+from message.serializers import MessageSerializer
 from trade.models import TradeProposal, Trade
-from .models import Notification
+from . import counters
+from .broker import get_broker
+from .models import NotificationEvent
+
+
+def publish_event(user_id, event_type, data):
+    """Push an event to the user's open streams once the transaction commits"""
+    event = {"type": event_type, "data": data}
+    transaction.on_commit(lambda: get_broker().publish(user_id, event))
+
+
+def queue_notification_event(event_type, object_id, **payload):
+    """
+    Append an outbox row in the current transaction. Notifications are
+    rendered later by `process_notification_outbox` (see outbox.py).
+    """
+    NotificationEvent.objects.create(event_type=event_type, object_id=object_id, payload=payload)
+
+
+@receiver(post_save, sender=Message)
+def push_new_message(sender, instance, created, **kwargs):
+    """Stream a new message to its receiver"""
+    if created:
+        publish_event(instance.receiver_id, "message", MessageSerializer(instance).data)
+
+
+@receiver(post_save, sender=Message)
+def count_unread_message(sender, instance, created, **kwargs):
+    """Bump the receiver's unread message counter"""
+    if created and not instance.is_read and instance.sender_id != instance.receiver_id:
+        counters.adjust("messages", {instance.receiver_id: 1})
 
 
 @receiver(post_save, sender=Message)
 def create_message_notification(sender, instance, created, **kwargs):
-    """Create notification when a new message is sent"""
+    """Queue a notification when a new message is sent"""
     if created:
-        Notification.objects.create(
-            user=instance.receiver,
-            message=instance,
-            type="new_message",
-            message_text=f"New message from {instance.sender.username}",
-            link_url=f"/app/dashboard/messages"
-        )
+        queue_notification_event("message_created", instance.message_id)
 
 
 @receiver(post_save, sender=TradeProposal)
 def create_trade_proposal_notification(sender, instance, created, **kwargs):
-    """Create notification when a new trade proposal is made"""
+    """Queue a notification when a trade proposal is made or accepted"""
     if created:
-        proposer_name = f"{instance.proposer.first_name} {instance.proposer.last_name}" if instance.proposer.first_name else instance.proposer.username
-        Notification.objects.create(
-            user=instance.recipient,
-            proposal=instance,
-            type="trade_proposal",
-            message_text=f"{proposer_name} proposed a trade: {instance.skill_offered_by_proposer.skill_name} for {instance.skill_desired_by_proposer.skill_name}",
-            link_url=f"/app/dashboard/proposal/{instance.proposal_id}"
-        )
-    elif not created and instance.status == "accepted":
+        queue_notification_event("proposal_created", instance.proposal_id)
+    elif instance.status == "accepted":
         # Notify the proposer when their proposal is accepted
-        recipient_name = (
-            f"{instance.recipient.first_name} {instance.recipient.last_name}"
-            if instance.recipient.first_name
-            else instance.recipient.username
-        ).title()
+        queue_notification_event("proposal_accepted", instance.proposal_id)
 
-        Notification.objects.create(
-            user=instance.proposer,
-            proposal=instance,
-            type="trade_accepted",
-            message_text=f"{recipient_name} accepted your trade proposal!",
-            link_url=f"/app/dashboard/proposal/{instance.proposal_id}"
-        )
 
 @receiver(post_save, sender=Trade)
 def create_trade_notification(sender, instance, created, **kwargs):
-    """Create notification when a trade is created or status changes"""
-    user1_name = f"{instance.user1.first_name} {instance.user1.last_name}" if instance.user1.first_name else instance.user1.username
-    user2_name = f"{instance.user2.first_name} {instance.user2.last_name}" if instance.user2.first_name else instance.user2.username
-    
-    if created and instance.proposal:
-        # Notify both users that a trade has been created
-        # Notify user2
-        Notification.objects.create(
-            user=instance.user2,
-            trade=instance,
-            type="trade_accepted",
-            message_text=f"Trade started with {user1_name}: {instance.skill1.skill_name} ↔ {instance.skill2.skill_name}",
-            link_url=f"/app/dashboard/trade/{instance.trade_id}"
-        )
-        
-        # Notify user1
-        Notification.objects.create(
-            user=instance.user1,
-            trade=instance,
-            type="trade_accepted",
-            message_text=f"Trade started with {user2_name}: {instance.skill1.skill_name} ↔ {instance.skill2.skill_name}",
-            link_url=f"/app/dashboard/trade/{instance.trade_id}"
-        )
-    
+    """Queue notifications when a trade is created or status changes"""
+    if created and instance.proposal_id:
+        queue_notification_event("trade_created", instance.trade_id)
     elif not created and instance.status in ['active', 'in_progress']:
-        # Notify both users when trade becomes active or in progress
-        # Check if notification already exists to avoid duplicates
-        existing_active_notif_user1 = Notification.objects.filter(
-            user=instance.user1,
-            trade=instance,
-            type="trade_active"
-        ).exists()
-        
-        existing_active_notif_user2 = Notification.objects.filter(
-            user=instance.user2,
-            trade=instance,
-            type="trade_active"
-        ).exists()
-        
-        if not existing_active_notif_user2:
-            Notification.objects.create(
-                user=instance.user2,
-                trade=instance,
-                type="trade_active",
-                message_text=f"Trade with {user1_name} is now {instance.status}: {instance.skill1.skill_name} ↔ {instance.skill2.skill_name}",
-                link_url=f"/app/dashboard/trade/{instance.trade_id}"
-            )
-        
-        if not existing_active_notif_user1:
-            Notification.objects.create(
-                user=instance.user1,
-                trade=instance,
-                type="trade_active",
-                message_text=f"Trade with {user2_name} is now {instance.status}: {instance.skill1.skill_name} ↔ {instance.skill2.skill_name}",
-                link_url=f"/app/dashboard/trade/{instance.trade_id}"
-            )
+        queue_notification_event("trade_status_changed", instance.trade_id, status=instance.status)
@@ -1,3 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from listings.models import SkillListing
+from message.models import Message
+from skills.models import Skill
+from trade.models import Trade, TradeProposal
+from . import counters
+from .models import Notification
+
+
+class NotificationListQueryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="reader@example.com", password="pw12345!", username="reader")
+        self.other = User.objects.create_user(email="sender@example.com", password="pw12345!", username="sender")
+        self.guitar = Skill.objects.create(skill_name="Guitar", category="Music")
+        self.french = Skill.objects.create(skill_name="French", category="Languages")
+        self.listing = SkillListing.objects.create(
+            user=self.user, skill_offered=self.guitar, skill_desired=self.french, title="Guitar for French", description="",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def seed(self, count):
+        """``count`` notifications, each with its own message, proposal and trade"""
+        for i in range(count):
+            message = Message.objects.create(sender=self.other, receiver=self.user, content=f"Hello {i}")
+            proposal = TradeProposal.objects.create(
+                listing=self.listing, proposer=self.other, recipient=self.user,
+                skill_offered_by_proposer=self.french, skill_desired_by_proposer=self.guitar, message=f"Swap {i}",
+            )
+            trade = Trade.objects.create(
+                proposal=proposal, user1=self.other, user2=self.user,
+                skill1=self.french, skill2=self.guitar, terms_agreed="Weekly",
+            )
+            Notification.objects.create(
+                user=self.user, message=message, proposal=proposal, trade=trade,
+                type="trade_accepted", message_text=f"Notification {i}",
+            )
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v1/notifications/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        return len(response.data["results"]), len(queries)
+
+    def test_query_count_does_not_grow_with_notifications(self):
+        self.seed(5)
+        few, few_queries = self.list_queries()
+        self.seed(45)
+        many, many_queries = self.list_queries()
+
+        self.assertEqual((few, many), (5, 50))
+        self.assertGreater(few_queries, 0)
+        self.assertEqual(few_queries, many_queries)
+
+
+class DigestNotificationsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="reader@example.com", password="pw12345!", username="reader")
+        old = timezone.now() - timedelta(days=5)
+        for count, is_read, timestamp in [(1, False, old), (2, False, old), (1, True, old), (1, False, timezone.now())]:
+            Notification.objects.create(
+                user=self.user, type="new_message", message_text="Hello", count=count, is_read=is_read, timestamp=timestamp,
+            )
+        # Seed the counter from the real totals
+        counters.get_counter(self.user.user_id)
+
+    def test_counter_matches_the_rows_rolled_up(self):
+        call_command("digest_notifications", stdout=StringIO())
 
-# Create your tests here.
+        digest = Notification.objects.get(user=self.user, type="digest")
+        self.assertEqual(digest.count, 3)
+        self.assertEqual(Notification.objects.filter(user=self.user, is_read=False).count(), 2)
+        self.assertEqual(counters.get_counter(self.user.user_id).notifications, 2)
@@ -1,27 +1,64 @@
+import json
+import secrets
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db import transaction
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+from accounts.models import User
+from . import counters
+from .broker import get_broker
 from .models import Notification
+from .pagination import NotificationPagination
 from .serializers import NotificationSerializer
 
 
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+def stream_ticket_key(ticket):
+    return f"notification:stream-ticket:{ticket}"
+
+
 class NotificationViewSet(viewsets.ModelViewSet):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationPagination
 
     def get_queryset(self):
-        return Notification.objects.filter(user=self.request.user).order_by("-timestamp")
+        queryset = Notification.objects.filter(user=self.request.user).order_by("-timestamp", "-notification_id")
+        return NotificationSerializer.setup_eager_loading(queryset)
 
     def perform_update(self, serializer):
-        serializer.save(is_read=True)
+        was_unread = not serializer.instance.is_read
+        with transaction.atomic():
+            notification = serializer.save(is_read=True)
+            if was_unread:
+                counters.adjust("notifications", {notification.user_id: -1})
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            if not instance.is_read:
+                counters.adjust("notifications", {instance.user_id: -1})
 
     @action(detail=False, methods=['post'])
     def mark_all_read(self, request):
         """Mark all notifications as read for the current user"""
-        updated_count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).update(is_read=True)
+        with transaction.atomic():
+            updated_count = Notification.objects.filter(
+                user=request.user,
+                is_read=False
+            ).update(is_read=True)
+            counters.reset("notifications", request.user.user_id)
         
         return Response({
             'status': 'success',
@@ -31,11 +68,88 @@ class NotificationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def unread_count(self, request):
         """Get count of unread notifications for the current user"""
-        count = Notification.objects.filter(
-            user=request.user,
-            is_read=False
-        ).count()
-        
+        counter = counters.get_counter(request.user.user_id)
+
         return Response({
-            'unread_count': count
+            'unread_count': counter.notifications
         }, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def stream_ticket(self, request):
+        """One-use ticket opening the push stream (EventSource cannot send the JWT header)"""
+        ticket = secrets.token_urlsafe(32)
+        expires_in = settings.NOTIFICATION_STREAM_TICKET_SECONDS
+        cache.set(stream_ticket_key(ticket), request.user.user_id, expires_in)
+
+        return Response({
+            'ticket': ticket,
+            'expires_in': expires_in
+        }, status=status.HTTP_201_CREATED)
+
+
+async def redeem_stream_ticket(ticket):
+    """The user a stream ticket was issued to; a ticket only works once."""
+    key = stream_ticket_key(ticket)
+    user_id = await cache.aget(key)
+    # delete() reports whether this call removed the key, so two redeemers cannot both win
+    if user_id is None or not await cache.adelete(key):
+        return None
+    return await User.objects.filter(user_id=user_id).afirst()
+
+
+async def authenticate_stream(request):
+    """
+    Resolve the user from a SimpleJWT access token sent as a Bearer header,
+    or from a ?ticket= issued by stream_ticket for clients that cannot set
+    headers. Access tokens are never read from the query string, where they
+    would end up in access logs.
+    """
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        authentication = JWTAuthentication()
+        try:
+            validated_token = authentication.get_validated_token(header[7:])
+            return await sync_to_async(authentication.get_user)(validated_token)
+        except (InvalidToken, AuthenticationFailed):
+            return None
+
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return await redeem_stream_ticket(ticket)
+    return None
+
+
+async def notification_stream(request):
+    """
+    Server-Sent Events endpoint:
+    GET /api/v1/notifications/stream/?ticket=<from POST stream_ticket/>
+    Streams `message` and `notification` events for the current user.
+    Needs the ASGI application (swapo.asgi) to hold connections open; under
+    WSGI every open stream would pin a worker, so it answers 501 there.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"detail": "The notification stream requires the ASGI server."}, status=501)
+
+    user = await authenticate_stream(request)
+    if user is None or not user.is_active:
+        return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+
+    subscription = get_broker().subscribe(user.user_id)
+
+    async def events():
+        try:
+            yield ": connected\n\n"
+            while True:
+                event = await subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                data = json.dumps(event["data"], cls=DjangoJSONEncoder)
+                yield f"event: {event['type']}\ndata: {data}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['category'], name='skills_skil_categor_853dbf_idx'),
+        ),
+    ]
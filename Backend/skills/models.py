@@ -5,6 +5,12 @@ class Skill(models.Model):
     skill_name = models.CharField(max_length=100, unique=True)
     category = models.CharField(max_length=50)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+      indexes = [
+        models.Index(fields=["category"]),
+      ]
 
     def __str__(self):
       return self.skill_name
@@ -1,14 +1,39 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from django.db.models import Count, Max
+from swapo.conditional import conditional
+from swapo.singleflight import single_flight
 from .models import Skill
 from .serializers import SkillSerializer
 from .permissions import IsAuthenticatedOrReadOnly
 
+def catalog_validators(view, request, *args, **kwargs):
+  """Validators of the skill catalog (ETag only): row count, newest id and newest change"""
+  catalog = Skill.objects.aggregate(count=Count("skill_id"), last_id=Max("skill_id"), updated_at=Max("updated_at"))
+  return catalog, None
+
+
+def skill_validators(view, request, pk=None, **kwargs):
+  updated_at = Skill.objects.filter(pk=pk).values_list("updated_at", flat=True).first() if str(pk).isdigit() else None
+  if updated_at is None:
+    return None
+  return updated_at, updated_at
+
+
 class SkillViewSet(viewsets.ModelViewSet):
   queryset = Skill.objects.all()
   serializer_class = SkillSerializer
   permission_classes = [IsAuthenticatedOrReadOnly]
 
+  @conditional(catalog_validators)
+  @single_flight("skills:catalog")
+  def list(self, request, *args, **kwargs):
+    return super().list(request, *args, **kwargs)
+
+  @conditional(skill_validators)
+  def retrieve(self, request, *args, **kwargs):
+    return super().retrieve(request, *args, **kwargs)
+
   def create(self, request, *args, **kwargs):
     is_many = isinstance(request.data, list)  # Check if a list is sent
     data_to_create = []
@@ -3,6 +3,10 @@ ASGI config for swapo project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The real-time push stream (/api/v1/notifications/stream/) is an async
+view that keeps connections open, so serve it from this application with
+an ASGI server (e.g. uvicorn or daphne) rather than the WSGI one.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -0,0 +1,65 @@
+"""
+Conditional GET for the public read endpoints.
+
+A view method decorated with ``conditional(validator)`` first calls
+``validator(view, request, *args, **kwargs)``, which must answer from a
+cheap query (timestamps, counts, ids; never the serialized body) with
+``(parts, last_modified)``:
+
+- ``parts``: any repr-able values that change whenever the body changes;
+  their hash becomes the ETag;
+- ``last_modified``: the newest change time covered by ``parts``, or None.
+  Collections (feed pages, catalogs, per-user lists) must pass None:
+  removing a member leaves the newest remaining timestamp unchanged, so
+  If-Modified-Since would answer a stale 304. Their ETag covers the ids
+  or counts and does change.
+
+A request whose If-None-Match (or If-Modified-Since) still matches gets a
+304 without the view running; otherwise the view's 200 response carries
+both validators. A validator returning None skips the check (e.g. the
+object does not exist, and the view will answer 404). The ETag is also
+left on ``request.validator_etag`` for singleflight.py, and stale bodies
+served from there (X-Cache: STALE) are sent without validators.
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(parts):
+    return quote_etag(hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest())
+
+
+def latest(*timestamps):
+    """The newest of ``timestamps``, ignoring missing ones."""
+    present = [timestamp for timestamp in timestamps if timestamp is not None]
+    return max(present) if present else None
+
+
+def conditional(validator):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            validators = validator(view, request, *args, **kwargs)
+            if validators is None:
+                return method(view, request, *args, **kwargs)
+
+            parts, last_modified = validators
+            # The query string selects filters and pages, so it is part of the validator
+            etag = make_etag((request.get_full_path(), parts))
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                request.validator_etag = etag
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200 or response.get("X-Cache") == "STALE":
+                    return response
+            response.headers.setdefault("ETag", etag)
+            if last_modified:
+                response.headers.setdefault("Last-Modified", http_date(last_modified))
+            return response
+        return wrapper
+    return decorator
@@ -189,6 +189,55 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 }
 
+# Cache (listings/feed_cache.py). LocMem is per process; set REDIS_URL to share it between workers
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'swapo',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+LISTING_CACHE_TIMEOUT = int(os.environ.get('LISTING_CACHE_TIMEOUT', 300))
+# Single-flight read caching (swapo/singleflight.py): fresh and stale windows, recompute lock expiry
+SINGLE_FLIGHT_FRESH_SECONDS = int(os.environ.get('SINGLE_FLIGHT_FRESH_SECONDS', 300))
+SINGLE_FLIGHT_STALE_SECONDS = int(os.environ.get('SINGLE_FLIGHT_STALE_SECONDS', 60))
+SINGLE_FLIGHT_LOCK_SECONDS = int(os.environ.get('SINGLE_FLIGHT_LOCK_SECONDS', 30))
+
+# Reciprocal skill matching (userSkills/matching.py): rebuild each process's index after this many seconds
+MATCH_INDEX_MAX_AGE = int(os.environ.get('MATCH_INDEX_MAX_AGE', 600))
+# Suggested swaps kept per user by compute_match_suggestions (userSkills/suggestions.py)
+MATCH_SUGGESTIONS_TOP_K = int(os.environ.get('MATCH_SUGGESTIONS_TOP_K', 20))
+# Cached skill sets and privacy settings behind contact/visibility checks (accounts/privacy.py)
+CONTACT_POLICY_CACHE_TIMEOUT = int(os.environ.get('CONTACT_POLICY_CACHE_TIMEOUT', 300))
+
+# Real-time push (notification/broker.py). The in-process broker cannot reach streams from the outbox worker or other processes
+REALTIME_BROKER = os.environ.get(
+    'REALTIME_BROKER',
+    'notification.broker.RedisBroker' if os.environ.get('REDIS_URL') else 'notification.broker.InProcessBroker',
+)
+REALTIME_BROKER_URL = os.environ.get('REALTIME_BROKER_URL', os.environ.get('REDIS_URL'))
+# Lifetime of the one-use tickets opening the push stream; they live in the cache, so share it (REDIS_URL) across workers
+NOTIFICATION_STREAM_TICKET_SECONDS = int(os.environ.get('NOTIFICATION_STREAM_TICKET_SECONDS', 30))
+
+# Notification retention in days per type (notification/retention.py); types not listed are kept
+NOTIFICATION_RETENTION_DAYS = {
+    'new_message': 30,
+    'trade_proposal': 180,
+    'trade_accepted': 180,
+    'trade_active': 180,
+    'trade_completed': 365,
+    'system_alert': 30,
+    'digest': 30,
+}
+
 # Cloudinary
 cloudinary.config(
     cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
@@ -200,6 +249,17 @@ cloudinary.config(
 
 DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 
+# Portfolio/profile image uploads (listings/uploads.py)
+IMAGE_STORAGE_BACKEND = os.environ.get('IMAGE_STORAGE_BACKEND', 'listings.uploads.CloudinaryImageStorage')
+# "inline" waits for the parallel uploads in the request; "background" returns pending images
+IMAGE_UPLOAD_MODE = os.environ.get('IMAGE_UPLOAD_MODE', 'inline')
+IMAGE_UPLOAD_WORKERS = int(os.environ.get('IMAGE_UPLOAD_WORKERS', 6))
+IMAGE_UPLOAD_SPOOL_DIR = os.environ.get('IMAGE_UPLOAD_SPOOL_DIR', str(MEDIA_ROOT / 'upload_spool'))
+# Preprocessing before upload (listings/images.py): longest side in px, WEBP or JPEG, encoder quality
+IMAGE_MAX_DIMENSION = int(os.environ.get('IMAGE_MAX_DIMENSION', 2048))
+IMAGE_FORMAT = os.environ.get('IMAGE_FORMAT', 'WEBP')
+IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', 82))
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -0,0 +1,113 @@
+"""
+Single-flight recomputation with stale-while-revalidate for cached payloads.
+
+An entry is *fresh* for ``fresh`` seconds while its ``version`` matches the
+caller's, and may then be served *stale* for ``stale`` more seconds. When an
+entry is missing, expired or stale, only the worker that wins a per-key lock
+in the cache (``cache.add``, atomic on LocMem, Redis and Memcached)
+recomputes it. Meanwhile the other workers serve the stale value or, when
+there is none, wait for the winner's result instead of querying the
+database themselves.
+
+With LocMem the lock only spans the threads of one process; configure a
+shared cache (REDIS_URL) to coalesce across workers.
+"""
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from rest_framework.response import Response
+
+
+FRESH = "HIT"
+STALE = "STALE"
+WAITED = "WAITED"
+COMPUTED = "MISS"
+
+POLL_INTERVAL = 0.05
+
+
+def setting(name, default):
+    return getattr(settings, f"SINGLE_FLIGHT_{name}", default)
+
+
+def fetch(key, compute, version=None, fresh=None, stale=None, cache=None):
+    """
+    Return ``(value, state)`` for ``key``, where state is one of FRESH,
+    STALE, WAITED (another worker computed it) or COMPUTED.
+    Exceptions raised by ``compute`` propagate and nothing is cached.
+    """
+    cache = cache or default_cache
+    fresh = setting("FRESH_SECONDS", 300) if fresh is None else fresh
+    stale = setting("STALE_SECONDS", 60) if stale is None else stale
+    lock_timeout = setting("LOCK_SECONDS", 30)
+
+    entry = cache.get(key)
+    if entry is not None and entry["version"] == version and time.time() < entry["fresh_until"]:
+        return entry["value"], FRESH
+
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    if cache.add(lock_key, token, timeout=lock_timeout):
+        try:
+            value = compute()
+            cache.set(
+                key,
+                {"value": value, "version": version, "fresh_until": time.time() + fresh},
+                timeout=fresh + stale,
+            )
+            return value, COMPUTED
+        finally:
+            # Only release our own lock; an expired one may have been taken over
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    if entry is not None:
+        return entry["value"], STALE
+
+    # Cold miss while another worker computes: wait for its result
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry["version"] == version:
+            return entry["value"], WAITED
+        if cache.get(lock_key) is None:
+            # The winner failed (or its result is already outdated)
+            break
+    return compute(), COMPUTED
+
+
+class Uncacheable(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def single_flight(prefix):
+    """
+    Cache the 200 responses of a DRF view method per full path through
+    ``fetch``. The entry version is the ETag set by ``conditional`` (when
+    the method is also decorated with it), so a changed resource is
+    recomputed by one worker while the others serve the previous body.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            path = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+
+            def compute():
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200:
+                    raise Uncacheable(response)
+                return response.data
+
+            try:
+                data, state = fetch(f"{prefix}:{path}", compute, version=getattr(request, "validator_etag", None))
+            except Uncacheable as uncacheable:
+                return uncacheable.response
+            return Response(data, headers={"X-Cache": state})
+        return wrapper
+    return decorator
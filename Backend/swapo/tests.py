@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase, override_settings
+
+from . import singleflight
+
+
+@override_settings(CACHES={
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "single-flight-tests"},
+})
+class SingleFlightTests(SimpleTestCase):
+    threads = 16
+
+    def setUp(self):
+        self.computations = Counter()
+        self.lock = threading.Lock()
+
+    def compute(self, version):
+        def run():
+            with self.lock:
+                self.computations[version] += 1
+            # Long enough for every thread to miss the cache while it runs
+            time.sleep(0.2)
+            return f"payload v{version}"
+        return run
+
+    def parallel(self, call):
+        barrier = threading.Barrier(self.threads)
+
+        def run():
+            barrier.wait()
+            return call()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            return [future.result() for future in [pool.submit(run) for _ in range(self.threads)]]
+
+    def test_cold_key_is_computed_once(self):
+        results = self.parallel(lambda: singleflight.fetch("cold", self.compute(1), version=1))
+
+        self.assertEqual(self.computations[1], 1)
+        self.assertEqual({value for value, _ in results}, {"payload v1"})
+        self.assertEqual(
+            Counter(state for _, state in results),
+            {singleflight.COMPUTED: 1, singleflight.WAITED: self.threads - 1},
+        )
+
+    def test_stale_key_is_recomputed_once(self):
+        singleflight.fetch("stale", self.compute(1), version=1)
+        results = self.parallel(lambda: singleflight.fetch("stale", self.compute(2), version=2))
+
+        self.assertEqual(self.computations[2], 1)
+        # Everyone but the recomputing thread is served the previous value at once
+        self.assertEqual(
+            Counter(results),
+            {("payload v2", singleflight.COMPUTED): 1, ("payload v1", singleflight.STALE): self.threads - 1},
+        )
+        self.assertEqual(singleflight.fetch("stale", self.compute(2), version=2), ("payload v2", singleflight.FRESH))
+
+    def test_expired_key_is_recomputed_once(self):
+        singleflight.fetch("expired", self.compute(1), version=1, fresh=0)
+        results = self.parallel(lambda: singleflight.fetch("expired", self.compute(1), version=1))
+
+        self.assertEqual(self.computations[1], 2)
+        self.assertEqual(Counter(state for _, state in results)[singleflight.COMPUTED], 1)
+
+    def test_failed_compute_is_not_cached(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            singleflight.fetch("failing", fail, version=1)
+        self.assertEqual(singleflight.fetch("failing", self.compute(1), version=1), ("payload v1", singleflight.COMPUTED))
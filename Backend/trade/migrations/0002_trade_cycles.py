@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-18 19:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skills', '0003_skill_updated_at'),
+        ('trade', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TradeCycle',
+            fields=[
+                ('cycle_id', models.AutoField(primary_key=True, serialize=False)),
+                ('signature', models.CharField(max_length=100, unique=True)),
+                ('size', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('proposed', 'Proposed'), ('declined', 'Declined'), ('expired', 'Expired')], default='proposed', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status'], name='trade_trade_status_2c1336_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TradeCycleLeg',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('cycle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='legs', to='trade.tradecycle')),
+                ('giver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cycle_legs_given', to=settings.AUTH_USER_MODEL)),
+                ('receiver', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cycle_legs_received', to=settings.AUTH_USER_MODEL)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cycle_legs', to='skills.skill')),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('cycle', 'position'), name='unique_trade_cycle_position')],
+            },
+        ),
+    ]
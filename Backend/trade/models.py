@@ -55,3 +55,48 @@ class Trade(models.Model):
 
     def __str__(self):
         return f"Trade {self.trade_id}: {self.user1} ↔ {self.user2}"
+
+
+class TradeCycle(models.Model):
+    """
+    A proposed multi-party swap (3 or 4 people) where each member teaches
+    the next what they want, found by userSkills/cycles.py. `signature` is
+    the member ids in cycle order, starting from the smallest.
+    """
+    CYCLE_STATUS_CHOICES = [
+        ("proposed", "Proposed"),
+        ("declined", "Declined"),
+        ("expired", "Expired"),
+    ]
+
+    cycle_id = models.AutoField(primary_key=True)
+    signature = models.CharField(max_length=100, unique=True)
+    size = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=20, choices=CYCLE_STATUS_CHOICES, default="proposed")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status"]),
+        ]
+
+    def __str__(self):
+        return f"Trade cycle {self.cycle_id}: {self.signature} ({self.status})"
+
+
+class TradeCycleLeg(models.Model):
+    cycle = models.ForeignKey(TradeCycle, on_delete=models.CASCADE, related_name="legs")
+    position = models.PositiveSmallIntegerField()
+    giver = models.ForeignKey(User, on_delete=models.CASCADE, related_name="cycle_legs_given")
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name="cycle_legs_received")
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name="cycle_legs")
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["cycle", "position"], name="unique_trade_cycle_position"),
+        ]
+
+    def __str__(self):
+        return f"{self.giver} teaches {self.skill} to {self.receiver}"
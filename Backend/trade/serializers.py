@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Trade, TradeProposal
+from .models import Trade, TradeProposal, TradeCycle, TradeCycleLeg
 from accounts.serializers import PublicUserSerializer
 from skills.serializers import SkillSerializer
 
@@ -14,7 +14,7 @@ class TradeProposalSerializer(serializers.ModelSerializer):
     class Meta:
         model = TradeProposal
         fields = "__all__"
-        read_only_fields = ["proposal_id", "proposal_date", "last_status_update"]
+        read_only_fields = ["proposal_id", "proposer", "proposal_date", "last_status_update"]
 
 
 class TradeSerializer(serializers.ModelSerializer):
@@ -28,3 +28,21 @@ class TradeSerializer(serializers.ModelSerializer):
         model = Trade
         fields = "__all__"
         read_only_fields = ["trade_id", "start_date"]
+
+
+class TradeCycleLegSerializer(serializers.ModelSerializer):
+    giver_details = PublicUserSerializer(source='giver', read_only=True)
+    receiver_details = PublicUserSerializer(source='receiver', read_only=True)
+    skill_details = SkillSerializer(source='skill', read_only=True)
+
+    class Meta:
+        model = TradeCycleLeg
+        fields = ["position", "giver", "receiver", "skill", "giver_details", "receiver_details", "skill_details"]
+
+
+class TradeCycleSerializer(serializers.ModelSerializer):
+    legs = TradeCycleLegSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = TradeCycle
+        fields = ["cycle_id", "size", "status", "created_at", "legs"]
@@ -1,3 +1,56 @@
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import User, UserPrivacy
+from listings.models import SkillListing
+from skills.models import Skill
+from userSkills.models import UserSkill
+from .models import TradeProposal
+
+
+class TradeProposalCreateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.proposer = User.objects.create_user(email="proposer@example.com", password="pw12345!", username="proposer")
+        self.recipient = User.objects.create_user(email="recipient@example.com", password="pw12345!", username="recipient")
+        self.bystander = User.objects.create_user(email="bystander@example.com", password="pw12345!", username="bystander")
+        self.guitar = Skill.objects.create(skill_name="Guitar", category="Music")
+        self.french = Skill.objects.create(skill_name="French", category="Languages")
+        self.listing = SkillListing.objects.create(
+            user=self.recipient, skill_offered=self.guitar, skill_desired=self.french, title="Guitar for French", description="",
+        )
+
+    def propose(self, user, **extra):
+        client = APIClient()
+        if user:
+            client.force_authenticate(user)
+        return client.post("/api/v1/trades/proposals/", {
+            "listing": self.listing.listing_id,
+            "recipient": self.recipient.user_id,
+            "skill_offered_by_proposer": self.french.skill_id,
+            "skill_desired_by_proposer": self.guitar.skill_id,
+            **extra,
+        }, format="json", secure=True)
+
+    def test_requires_authentication(self):
+        self.assertEqual(self.propose(None).status_code, 401)
+
+    def test_proposer_is_the_requester(self):
+        response = self.propose(self.proposer, proposer=self.bystander.user_id)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(TradeProposal.objects.get().proposer, self.proposer)
+
+    def test_mutual_skills_policy_checks_the_requester(self):
+        UserPrivacy.objects.create(user=self.recipient, contact_option="People with mutual skills")
+        UserSkill.objects.create(user=self.recipient, skill=self.guitar, skill_type="offering")
+        UserSkill.objects.create(user=self.bystander, skill=self.guitar, skill_type="desiring")
+
+        # Naming a proposer who shares a skill does not get past the check
+        self.assertEqual(self.propose(self.proposer, proposer=self.bystander.user_id).status_code, 403)
+
+        UserSkill.objects.create(user=self.proposer, skill=self.guitar, skill_type="desiring")
+        # The cached skill sets are dropped on commit, which never comes inside a TestCase
+        cache.clear()
+        self.assertEqual(self.propose(self.proposer).status_code, 201)
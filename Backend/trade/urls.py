@@ -1,9 +1,10 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TradeViewSet, TradeProposalViewSet
+from .views import TradeViewSet, TradeProposalViewSet, TradeCycleViewSet
 
 router = DefaultRouter()
 router.register(r'proposals', TradeProposalViewSet, basename='tradeproposal')
+router.register(r'cycles', TradeCycleViewSet, basename='tradecycle')
 router.register(r'', TradeViewSet, basename='trade')
 
 urlpatterns = [
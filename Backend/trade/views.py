@@ -1,16 +1,32 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
+from django.db.models import Q
 from django.utils import timezone
 
-from .models import Trade, TradeProposal
-from .serializers import TradeSerializer, TradeProposalSerializer
+from accounts import privacy
+from .models import Trade, TradeProposal, TradeCycle
+from .serializers import TradeSerializer, TradeProposalSerializer, TradeCycleSerializer
 
 
 class TradeProposalViewSet(viewsets.ModelViewSet):
-    queryset = TradeProposal.objects.all().order_by("-proposal_date")
     serializer_class = TradeProposalSerializer
-    # permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        """Filter proposals to those the user made or received"""
+        user = self.request.user
+        return TradeProposal.objects.filter(
+            Q(proposer=user) | Q(recipient=user)
+        ).order_by("-proposal_date")
+
+    def perform_create(self, serializer):
+        # The proposer is always the requester, whatever the client sent
+        recipient = serializer.validated_data["recipient"]
+        if not privacy.can_contact(self.request.user.user_id, recipient.user_id):
+            raise PermissionDenied(privacy.contact_refusal(recipient.user_id))
+        serializer.save(proposer=self.request.user)
 
     @action(detail=True, methods=['post'])
     def accept(self, request, pk=None):
@@ -74,7 +90,6 @@ class TradeViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter trades to show only those the user is involved in"""
         user = self.request.user
-        from django.db.models import Q
         return Trade.objects.filter(
             Q(user1=user) | Q(user2=user)
         ).order_by("-start_date")
@@ -100,3 +115,25 @@ class TradeViewSet(viewsets.ModelViewSet):
             "detail": "Trade marked as completed",
             "trade": TradeSerializer(trade).data
         }, status=status.HTTP_200_OK)
+
+
+class TradeCycleViewSet(viewsets.ReadOnlyModelViewSet):
+    """Proposed multi-party trades (userSkills/cycles.py) the user takes part in"""
+    serializer_class = TradeCycleSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        member_of = TradeCycle.objects.filter(legs__giver=self.request.user).values("cycle_id")
+        return (
+            TradeCycle.objects.filter(cycle_id__in=member_of, status="proposed")
+            .prefetch_related("legs__giver", "legs__receiver", "legs__skill")
+            .order_by("-created_at")
+        )
+
+    @action(detail=True, methods=['post'])
+    def decline(self, request, pk=None):
+        """Any member can decline; a declined cycle is not proposed again"""
+        cycle = self.get_object()
+        cycle.status = 'declined'
+        cycle.save(update_fields=['status', 'updated_at'])
+        return Response({"detail": "Trade cycle declined"}, status=status.HTTP_200_OK)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import UserSkill
+from .models import UserSkill, MatchSuggestion
 
 # Register your models here.
 admin.site.register(UserSkill)
+admin.site.register(MatchSuggestion)
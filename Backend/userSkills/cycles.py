@@ -0,0 +1,253 @@
+"""
+Multi-party swaps: 3- and 4-person cycles where each member teaches the
+next something they want (A -> B -> C -> A), for people with no direct
+reciprocal partner.
+
+The directed "can teach what you want" graph is never materialized (with
+popular skills it has billions of edges). Its adjacency is read from the
+bitset posting lists of matching.py instead:
+
+  students(a) = OR of desired_by[s] for the skills a offers   (a -> x)
+  teachers(a) = OR of offered_by[s] for the skills a desires  (x -> a)
+
+and the search from a user ``a`` is bounded by ``branching``:
+
+- 3-cycles: for up to ``branching`` sampled students b, any c in
+  students(b) & teachers(a) closes a -> b -> c -> a;
+- 4-cycles: for sampled students b and sampled teachers d, any c in
+  students(b) & teachers(d) closes a -> b -> c -> d -> a.
+
+Each closing set is one big-int AND, so a search costs at most
+``branching`` + ``branching ** 2`` of them whatever the degrees are.
+
+Found cycles are stored as TradeCycle proposals. Every run first expires
+proposals that no longer hold (a skill was removed, a member deactivated
+or blocked another). The incremental mode then only searches from users
+whose skills, listings or profile changed since a given time: any new
+cycle has a new edge, and every new edge touches such a user.
+"""
+import random
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from listings.models import SkillListing
+from trade.models import TradeCycle, TradeCycleLeg
+from .matching import build_index
+from .models import UserSkill
+from .suggestions import blocked_pairs
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+def students(index, user_id):
+  """Users who desire something ``user_id`` offers."""
+  bitset = 0
+  for skill_id in index.user_offers.get(user_id, ()):
+    bitset |= index.desired_by.get(skill_id, 0)
+  return bitset
+
+
+def teachers(index, user_id):
+  """Users who offer something ``user_id`` desires."""
+  bitset = 0
+  for skill_id in index.user_desires.get(user_id, ()):
+    bitset |= index.offered_by.get(skill_id, 0)
+  return bitset
+
+
+def random_slot(bitset, rng):
+  """A set bit of ``bitset`` near a random position, without listing them all."""
+  start = rng.randrange(bitset.bit_length())
+  above = bitset >> start
+  if above:
+    return start + (above & -above).bit_length() - 1
+  return (bitset & -bitset).bit_length() - 1
+
+
+def sample_slots(bitset, rng, count):
+  return {random_slot(bitset, rng) for _ in range(count)} if bitset else set()
+
+
+def stranded(index, user_id):
+  """True when nobody both teaches ``user_id`` something and wants something back."""
+  return not (students(index, user_id) & teachers(index, user_id) & ~(1 << index.slots[user_id]))
+
+
+def find_cycles(index, user_id, rng, limit=3, branching=32, accept=None):
+  """
+  Up to ``limit`` cycles through ``user_id`` as tuples of user ids, each
+  teaching the next and the last teaching ``user_id``; 3-cycles first.
+  ``accept(members)`` can veto a cycle (blocked pairs, busy members).
+  """
+  me = 1 << index.slots[user_id]
+  my_students = students(index, user_id) & ~me
+  my_teachers = teachers(index, user_id) & ~me
+  if not my_students or not my_teachers:
+    return []
+
+  found = []
+
+  def close(members, closing):
+    # A few random picks among the users closing the cycle
+    for _ in range(4):
+      if not closing:
+        return False
+      slot = random_slot(closing, rng)
+      cycle = (*members[:2], index.user_ids[slot], *members[2:])
+      if accept is None or accept(cycle):
+        found.append(cycle)
+        return True
+      closing &= ~(1 << slot)
+    return False
+
+  # Neighbours are expanded one at a time, so dense graphs stop after a few
+  firsts = {}
+  for slot in sample_slots(my_students, rng, branching):
+    first = index.user_ids[slot]
+    their_students = students(index, first) & ~me & ~(1 << slot)
+    firsts[slot] = (first, their_students)
+    if close((user_id, first), their_students & my_teachers) and len(found) >= limit:
+      return found
+
+  lasts = []
+  for slot in sample_slots(my_teachers, rng, branching):
+    last = index.user_ids[slot]
+    lasts.append((slot, last, teachers(index, last) & ~me))
+  for first_slot, (first, their_students) in firsts.items():
+    for last_slot, last, their_teachers in lasts:
+      if last_slot == first_slot:
+        continue
+      if close((user_id, first, last), their_students & their_teachers & ~(1 << last_slot)):
+        if len(found) >= limit:
+          return found
+        break
+  return found
+
+
+def canonical(cycle):
+  """Rotate a cycle to start from its smallest member, keeping the direction."""
+  start = cycle.index(min(cycle))
+  return cycle[start:] + cycle[:start]
+
+
+def signature(cycle):
+  return ">".join(map(str, cycle))
+
+
+def legs_of(cycle):
+  """(giver, receiver) pairs around the cycle."""
+  return list(zip(cycle, cycle[1:] + cycle[:1]))
+
+
+def leg_skill(index, giver, receiver):
+  """The skill ``giver`` teaches ``receiver`` best, or None when there is none."""
+  offers = index.user_offers.get(giver, {})
+  shared = [skill_id for skill_id in index.user_desires.get(receiver, ()) if skill_id in offers]
+  return max(shared, key=lambda skill_id: (offers[skill_id], -skill_id)) if shared else None
+
+
+def holds(index, legs, blocks):
+  members = {leg.giver_id for leg in legs}
+  if any(blocks.get(member, set()) & members for member in members):
+    return False
+  return all(
+    leg.skill_id in index.user_offers.get(leg.giver_id, {})
+    and leg.skill_id in index.user_desires.get(leg.receiver_id, ())
+    for leg in legs
+  )
+
+
+def changed_users(since):
+  return (
+    set(UserSkill.objects.filter(updated_at__gte=since).values_list("user_id", flat=True))
+    | set(SkillListing.objects.filter(last_updated__gte=since).values_list("user_id", flat=True))
+    | set(User.objects.filter(updated_at__gte=since).values_list("user_id", flat=True))
+  )
+
+
+def discover_cycles(changed_since=None, limit=3, branching=32, everyone=False, seed=None, dry_run=False):
+  """
+  Expire broken proposals, then search for new cycles from every stranded
+  user (everyone with ``everyone``) or, with ``changed_since``, only from
+  the users changed since then. A user takes part in at most ``limit``
+  proposed cycles. Returns counts for reporting.
+  """
+  index = build_index()
+  blocks = blocked_pairs()
+  rng = random.Random(seed)
+
+  proposed = TradeCycle.objects.filter(status="proposed").prefetch_related("legs")
+  expired = []
+  load = Counter()
+  for cycle in proposed.iterator(chunk_size=BATCH_SIZE):
+    legs = list(cycle.legs.all())
+    if holds(index, legs, blocks):
+      load.update(leg.giver_id for leg in legs)
+    else:
+      expired.append(cycle.cycle_id)
+
+  candidates = index.user_offers.keys() & index.user_desires.keys()
+  if changed_since is not None:
+    candidates &= changed_users(changed_since)
+  starts = [
+    user_id for user_id in sorted(candidates)
+    if load[user_id] < limit and (everyone or stranded(index, user_id))
+  ]
+
+  found = {}
+
+  def accept(cycle):
+    """Take a cycle unless it is known, a member is busy or two members blocked each other."""
+    cycle = canonical(cycle)
+    key = signature(cycle)
+    members = set(cycle)
+    if (
+      key in found
+      or any(load[member] >= limit for member in cycle)
+      or any(blocks.get(member, set()) & members for member in cycle)
+    ):
+      return False
+    found[key] = cycle
+    load.update(cycle)
+    return True
+
+  for user_id in starts:
+    if load[user_id] < limit:
+      find_cycles(index, user_id, rng, limit - load[user_id], branching, accept)
+
+  created = 0
+  with transaction.atomic():
+    if not dry_run:
+      TradeCycle.objects.filter(cycle_id__in=expired).update(status="expired", updated_at=timezone.now())
+    keys = list(found)
+    for start in range(0, len(keys), BATCH_SIZE):
+      batch = keys[start:start + BATCH_SIZE]
+      existing = dict(TradeCycle.objects.filter(signature__in=batch).values_list("signature", "status"))
+      # Expired cycles found again are proposed afresh; others (incl. declined) are left alone
+      renewed = [key for key in batch if existing.get(key) == "expired"]
+      new = [key for key in batch if existing.get(key, "expired") == "expired"]
+      created += len(new)
+      if dry_run or not new:
+        continue
+      TradeCycle.objects.filter(signature__in=renewed).delete()
+      cycles = TradeCycle.objects.bulk_create(
+        [TradeCycle(signature=key, size=len(found[key])) for key in new]
+      )
+      TradeCycleLeg.objects.bulk_create([
+        TradeCycleLeg(
+          cycle=cycle,
+          position=position,
+          giver_id=giver,
+          receiver_id=receiver,
+          skill_id=leg_skill(index, giver, receiver),
+        )
+        for cycle in cycles
+        for position, (giver, receiver) in enumerate(legs_of(found[cycle.signature]))
+      ])
+
+  return {"expired": len(expired), "searched": len(starts), "created": created}
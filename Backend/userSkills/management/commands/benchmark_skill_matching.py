@@ -0,0 +1,61 @@
+import random
+import resource
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from userSkills.matching import MatchIndex, build_index, synthetic_rows
+
+
+class Command(BaseCommand):
+    help = 'Build the reciprocal skill-match index over synthetic (or real) rows and time match queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000, help='Synthetic users')
+        parser.add_argument('--skills', type=int, default=2_000, help='Synthetic skills')
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic user-skill rows')
+        parser.add_argument('--queries', type=int, default=1_000, help='Timed match queries')
+        parser.add_argument('--limit', type=int, default=20, help='Matches returned per query')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+        parser.add_argument('--from-db', action='store_true', help='Index the database instead of synthetic rows')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        memory_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        started = time.perf_counter()
+        if options['from_db']:
+            index = build_index()
+        else:
+            index = MatchIndex().load(
+                synthetic_rows(rng, options['users'], options['skills'], options['rows']),
+                ((user_id, round(rng.uniform(1, 5), 2)) for user_id in range(options['users'])),
+            )
+        build_seconds = time.perf_counter() - started
+        memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memory_before) / 1024
+
+        users = [user_id for user_id in index.user_offers if user_id in index.user_desires]
+        if not users:
+            self.stdout.write(self.style.WARNING('No user both offers and desires a skill; nothing to query'))
+            return
+        sample = [rng.choice(users) for _ in range(options['queries'])]
+
+        timings = []
+        found = 0
+        for user_id in sample:
+            started = time.perf_counter()
+            found += len(index.matches(user_id, limit=options['limit']))
+            timings.append((time.perf_counter() - started) * 1000)
+
+        rows = sum(map(len, index.user_offers.values())) + sum(map(len, index.user_desires.values()))
+        percentiles = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f'Index: {rows} user-skill pairs, {len(index.offered_by)} skills, {len(users)} matchable users; '
+            f'built in {build_seconds:.2f}s, ~{memory:.0f} MB'
+        )
+        self.stdout.write(
+            f'{len(sample)} queries (limit {options["limit"]}, {found / len(sample):.1f} matches on average): '
+            f'p50 {percentiles[49]:.2f} ms, p95 {percentiles[94]:.2f} ms, p99 {percentiles[98]:.2f} ms, '
+            f'max {max(timings):.2f} ms'
+        )
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,76 @@
+import random
+import statistics
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from userSkills.cycles import find_cycles, leg_skill, legs_of, stranded
+from userSkills.matching import MatchIndex, synthetic_rows
+
+
+class Command(BaseCommand):
+    help = 'Time bounded 3-/4-way trade cycle search on a synthetic user graph, full and incremental'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100_000, help='Synthetic users')
+        parser.add_argument('--skills', type=int, default=2_000, help='Synthetic skills')
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic user-skill rows')
+        parser.add_argument('--exponent', type=float, default=1.0, help='Zipf exponent of skill popularity')
+        parser.add_argument('--sample', type=int, default=2_000, help='Users searched to time the full run')
+        parser.add_argument('--changed', type=int, default=100, help='Changed users in the incremental run')
+        parser.add_argument('--limit', type=int, default=3, help='Cycles per user')
+        parser.add_argument('--branching', type=int, default=32, help='Neighbours sampled per search step')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+        index = MatchIndex().load(
+            synthetic_rows(rng, options['users'], options['skills'], options['rows'], options['exponent']), []
+        )
+        self.stdout.write(f'Index built in {time.perf_counter() - started:.2f}s')
+
+        users = sorted(index.user_offers.keys() & index.user_desires.keys())
+        started = time.perf_counter()
+        without_partner = [user_id for user_id in users if stranded(index, user_id)]
+        self.stdout.write(
+            f'{len(users)} users offering and desiring, {len(without_partner)} without a direct partner '
+            f'(found in {time.perf_counter() - started:.2f}s)'
+        )
+
+        for label, population in (('All users', users), ('Users without a direct partner', without_partner)):
+            if population:
+                sample = rng.sample(population, min(options['sample'], len(population)))
+                self.time_search(label, index, sample, len(population), rng, options)
+
+        changed = rng.sample(users, min(options['changed'], len(users)))
+        started = time.perf_counter()
+        for user_id in changed:
+            index.replace_user(
+                user_id, [(user_id, rng.randrange(options['skills']), 'desiring', None)], None
+            )
+            find_cycles(index, user_id, rng, options['limit'], options['branching'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Incremental: {len(changed)} changed users updated and searched in {elapsed * 1000:.0f} ms'
+        )
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def time_search(self, label, index, sample, population, rng, options):
+        timings = []
+        sizes = Counter()
+        for user_id in sample:
+            started = time.perf_counter()
+            cycles = find_cycles(index, user_id, rng, options['limit'], options['branching'])
+            timings.append((time.perf_counter() - started) * 1000)
+            for cycle in cycles:
+                if len(set(cycle)) != len(cycle) or any(leg_skill(index, *leg) is None for leg in legs_of(cycle)):
+                    raise CommandError(f'Invalid cycle {cycle}')
+                sizes[len(cycle)] += 1
+        percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+        found = sum(1 for _ in sizes.elements())
+        self.stdout.write(
+            f'{label}: {len(sample)} searched, p50 {percentiles[49]:.2f} ms, p95 {percentiles[94]:.2f} ms, '
+            f'max {max(timings):.2f} ms; {sizes[3]} 3-way and {sizes[4]} 4-way cycles '
+            f'({found / len(sample):.2f} per user); all {population} in ~{statistics.mean(timings) * population / 1000:.0f}s'
+        )
@@ -0,0 +1,26 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from userSkills.suggestions import BATCH_SIZE, compute_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Recompute every user\'s top-K suggested swaps into the MatchSuggestion table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=settings.MATCH_SUGGESTIONS_TOP_K,
+                            help='Suggestions kept per user')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Rows per INSERT')
+        parser.add_argument('--dry-run', action='store_true', help='Score everything but write nothing')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        users, written = compute_suggestions(
+            k=options['top_k'], batch_size=options['batch_size'], dry_run=options['dry_run']
+        )
+        elapsed = time.perf_counter() - started
+        verb = 'Would write' if options['dry_run'] else 'Wrote'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {written} suggestions for {users} users in {elapsed:.1f}s'
+        ))
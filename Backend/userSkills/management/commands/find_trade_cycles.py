@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from userSkills.cycles import discover_cycles
+
+
+class Command(BaseCommand):
+    help = 'Propose 3- and 4-way trade cycles for users without a direct reciprocal partner'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true',
+                            help='Only search from users whose skills, listings or profile changed recently')
+        parser.add_argument('--since-minutes', type=int, default=60,
+                            help='With --incremental: how far back changes are considered (cover the schedule interval)')
+        parser.add_argument('--limit', type=int, default=3, help='Proposed cycles per user at most')
+        parser.add_argument('--branching', type=int, default=32, help='Neighbours sampled per search step')
+        parser.add_argument('--everyone', action='store_true', help='Also search for users who have direct partners')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for neighbour sampling')
+        parser.add_argument('--dry-run', action='store_true', help='Search but write nothing')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(minutes=options['since_minutes']) if options['incremental'] else None
+        started = time.perf_counter()
+        result = discover_cycles(
+            changed_since=since,
+            limit=options['limit'],
+            branching=options['branching'],
+            everyone=options['everyone'],
+            seed=options['seed'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - started
+        verb = 'Would propose' if options['dry_run'] else 'Proposed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {result["created"]} cycles from {result["searched"]} users, '
+            f'expired {result["expired"]}, in {elapsed:.1f}s'
+        ))
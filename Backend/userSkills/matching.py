@@ -0,0 +1,317 @@
+"""
+Reciprocal skill matching: people who offer what I want and want what I offer.
+
+An in-memory inverted index maps every skill to the users offering and the
+users desiring it, built from UserSkill rows plus active SkillListings (a
+listing offers its skill_offered and desires its skill_desired). Matches
+are ranked by overlap (number of skills exchanged both ways), then the
+average proficiency of what they offer me, then their rating.
+
+Posting lists are bitsets: Python ints with one bit per user slot. With
+popular skills a query easily reaches most users, so nothing is done per
+candidate until the end. A query
+
+- ORs the posting lists of my skills: candidates = (offering something I
+  want) & (wanting something I offer), minus myself and blocked users;
+- adds the same posting lists into a bit-sliced counter (one int per
+  binary digit of the overlap), so every candidate's overlap is computed
+  by a few dozen big-int operations;
+- reads off the candidates of the highest overlap, then the next, until
+  ``limit`` are collected, and only ranks those in Python.
+
+The index is built lazily per process, kept current for changes made by
+this process through signals (signals.py) and rebuilt in the background
+once older than ``MATCH_INDEX_MAX_AGE`` seconds, which picks up changes
+made by other workers.
+"""
+import heapq
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections
+from django.db.models import Q
+
+from listings.models import SkillListing
+from userblocks.models import UserBlock
+from .models import UserSkill
+
+User = get_user_model()
+
+PROFICIENCY_LEVELS = {"Beginner": 1, "Intermediate": 2, "Expert": 3}
+LEVEL_NAMES = {level: name for name, level in PROFICIENCY_LEVELS.items()}
+
+OFFERING = "offering"
+DESIRING = "desiring"
+
+Match = namedtuple("Match", ["user_id", "they_offer", "they_want", "overlap", "proficiency", "rating"])
+
+
+def to_bitset(slots):
+  if not slots:
+    return 0
+  bits = bytearray((max(slots) >> 3) + 1)
+  for slot in slots:
+    bits[slot >> 3] |= 1 << (slot & 7)
+  return int.from_bytes(bits, "little")
+
+
+def slots_of(bitset):
+  """Positions of the set bits, scanned by str.find rather than bit by bit."""
+  digits = bin(bitset)
+  last = len(digits) - 1
+  slots = []
+  position = digits.find("1", 2)
+  while position != -1:
+    slots.append(last - position)
+    position = digits.find("1", position + 1)
+  return slots
+
+
+def add_to_counter(planes, bitset, weight=1):
+  """Add ``weight`` to the bit-sliced counter ``planes`` at every bit set in ``bitset``."""
+  start = 0
+  while weight:
+    if weight & 1:
+      carry = bitset
+      for digit in range(start, len(planes)):
+        if not carry:
+          break
+        plane = planes[digit]
+        planes[digit] = plane ^ carry
+        carry &= plane
+      else:
+        while len(planes) < start:
+          planes.append(0)
+        if carry:
+          planes.append(carry)
+    weight >>= 1
+    start += 1
+
+
+def counted(planes, value, bitset):
+  """The bits of ``bitset`` whose count in ``planes`` is exactly ``value``."""
+  for digit, plane in enumerate(planes):
+    bitset = bitset & plane if value >> digit & 1 else bitset & ~plane
+  return bitset
+
+
+class MatchIndex:
+  def __init__(self):
+    self.offered_by = {}  # skill_id -> bitset of user slots offering it
+    self.desired_by = {}  # skill_id -> bitset of user slots desiring it
+    self.user_offers = {}  # user_id -> {skill_id: proficiency level, 0 when unknown}
+    self.user_desires = {}  # user_id -> set of skill_ids
+    self.ratings = {}
+    self.slots = {}  # user_id -> bit position; user ids need not be dense
+    self.user_ids = []
+    self.built_at = None
+    self.lock = threading.RLock()
+
+  def slot(self, user_id):
+    slot = self.slots.get(user_id)
+    if slot is None:
+      slot = self.slots[user_id] = len(self.user_ids)
+      self.user_ids.append(user_id)
+    return slot
+
+  def add(self, user_id, skill_id, skill_type, proficiency_level=None):
+    """Record one row in the per-user maps; the bitsets are updated by the caller."""
+    if skill_type == OFFERING:
+      offers = self.user_offers.setdefault(user_id, {})
+      level = PROFICIENCY_LEVELS.get(proficiency_level, 0)
+      offers[skill_id] = max(level, offers.get(skill_id, 0))
+    elif skill_type == DESIRING:
+      self.user_desires.setdefault(user_id, set()).add(skill_id)
+
+  def load(self, rows, ratings):
+    """Fill the index from ``(user_id, skill_id, skill_type, proficiency_level)`` rows."""
+    with self.lock:
+      for row in rows:
+        self.add(*row)
+      offered_by = defaultdict(list)
+      desired_by = defaultdict(list)
+      for user_id, offers in self.user_offers.items():
+        slot = self.slot(user_id)
+        for skill_id in offers:
+          offered_by[skill_id].append(slot)
+      for user_id, desires in self.user_desires.items():
+        slot = self.slot(user_id)
+        for skill_id in desires:
+          desired_by[skill_id].append(slot)
+      # Each bitset is built once; setting bits row by row would copy the int every time
+      self.offered_by = {skill_id: to_bitset(slots) for skill_id, slots in offered_by.items()}
+      self.desired_by = {skill_id: to_bitset(slots) for skill_id, slots in desired_by.items()}
+      self.ratings = {user_id: float(rating) for user_id, rating in ratings}
+      self.built_at = time.monotonic()
+    return self
+
+  def remove_user(self, user_id):
+    with self.lock:
+      slot = self.slots.get(user_id)
+      if slot is None:
+        return
+      bit = 1 << slot
+      for skill_id in self.user_offers.pop(user_id, {}):
+        self.offered_by[skill_id] &= ~bit
+      for skill_id in self.user_desires.pop(user_id, set()):
+        self.desired_by[skill_id] &= ~bit
+      self.ratings.pop(user_id, None)
+
+  def replace_user(self, user_id, rows, rating):
+    with self.lock:
+      self.remove_user(user_id)
+      for row in rows:
+        self.add(*row)
+      bit = 1 << self.slot(user_id)
+      for skill_id in self.user_offers.get(user_id, {}):
+        self.offered_by[skill_id] = self.offered_by.get(skill_id, 0) | bit
+      for skill_id in self.user_desires.get(user_id, set()):
+        self.desired_by[skill_id] = self.desired_by.get(skill_id, 0) | bit
+      if rating is not None:
+        self.ratings[user_id] = float(rating)
+
+  def matches(self, user_id, limit=20, exclude=()):
+    """The ``limit`` best reciprocal matches of ``user_id``, best first."""
+    with self.lock:
+      offered = self.user_offers.get(user_id, {})
+      wanted = self.user_desires.get(user_id, set())
+      if not offered or not wanted:
+        return []
+
+      planes = []
+      they_offer_something = 0
+      they_want_something = 0
+      for skill_id in wanted:
+        bitset = self.offered_by.get(skill_id, 0)
+        they_offer_something |= bitset
+        add_to_counter(planes, bitset)
+      for skill_id in offered:
+        bitset = self.desired_by.get(skill_id, 0)
+        they_want_something |= bitset
+        add_to_counter(planes, bitset)
+
+      excluded = 1 << self.slots[user_id]
+      for other in exclude:
+        if other in self.slots:
+          excluded |= 1 << self.slots[other]
+      candidates = they_offer_something & they_want_something & ~excluded
+
+      # Whole overlap groups, best first, until there are enough to rank
+      selected = []
+      for overlap in range((1 << len(planes)) - 1, 1, -1):
+        group = counted(planes, overlap, candidates)
+        if group:
+          selected.extend(self.user_ids[slot] for slot in slots_of(group))
+          if len(selected) >= limit:
+            break
+
+      scored = []
+      for candidate in selected:
+        their_offers = self.user_offers[candidate]
+        they_offer = {skill_id: their_offers[skill_id] for skill_id in wanted if skill_id in their_offers}
+        they_want = self.user_desires[candidate] & offered.keys()
+        scored.append(Match(
+          candidate,
+          they_offer,
+          they_want,
+          len(they_offer) + len(they_want),
+          sum(they_offer.values()) / len(they_offer),
+          self.ratings.get(candidate, 0.0),
+        ))
+    return heapq.nlargest(limit, scored, key=lambda match: (match.overlap, match.proficiency, match.rating))
+
+
+def user_rows(user_ids=None):
+  """Index rows of active users from UserSkill and active listings, optionally for some users only."""
+  skills = UserSkill.objects.filter(user__is_active=True)
+  listings = SkillListing.objects.filter(status="active", user__is_active=True)
+  if user_ids is not None:
+    skills = skills.filter(user_id__in=user_ids)
+    listings = listings.filter(user_id__in=user_ids)
+
+  yield from skills.values_list("user_id", "skill_id", "skill_type", "proficiency_level").iterator(chunk_size=10000)
+  for user_id, offered, desired in listings.values_list(
+    "user_id", "skill_offered_id", "skill_desired_id"
+  ).iterator(chunk_size=10000):
+    yield user_id, offered, OFFERING, None
+    yield user_id, desired, DESIRING, None
+
+
+def build_index():
+  ratings = User.objects.filter(is_active=True, rating__isnull=False).values_list("user_id", "rating")
+  return MatchIndex().load(user_rows(), ratings.iterator(chunk_size=10000))
+
+
+_index = None
+_index_lock = threading.Lock()
+_rebuilding = threading.Event()
+
+
+def rebuild_in_background():
+  def run():
+    global _index
+    try:
+      _index = build_index()
+    finally:
+      _rebuilding.clear()
+      close_old_connections()
+
+  _rebuilding.set()
+  threading.Thread(target=run, name="match-index-rebuild", daemon=True).start()
+
+
+def get_index():
+  """This process's index: built on first use, then refreshed in the background when old."""
+  global _index
+  if _index is None:
+    with _index_lock:
+      if _index is None:
+        _index = build_index()
+  elif (
+    time.monotonic() - _index.built_at > getattr(settings, "MATCH_INDEX_MAX_AGE", 600)
+    and not _rebuilding.is_set()
+  ):
+    rebuild_in_background()
+  return _index
+
+
+def refresh_user(user_id):
+  """Re-read one user's skills, listings and rating into the index, if it is built."""
+  if _index is None:
+    return
+  user = User.objects.filter(user_id=user_id).values_list("is_active", "rating").first()
+  if user is None or not user[0]:
+    _index.remove_user(user_id)
+    return
+  _index.replace_user(user_id, list(user_rows([user_id])), user[1])
+
+
+def blocked_user_ids(user_id):
+  """Users ``user_id`` blocked or was blocked by; neither side is matched with the other."""
+  blocks = UserBlock.objects.filter(Q(blocker_id=user_id) | Q(blocked_id=user_id))
+  return {
+    other
+    for blocker, blocked in blocks.values_list("blocker_id", "blocked_id")
+    for other in (blocker, blocked)
+    if other != user_id
+  }
+
+
+def synthetic_rows(rng, users, skills, rows, exponent=1.0):
+  """Index rows for benchmarks: Zipf-like skill popularity, half offerings and half desires."""
+  weights = [1 / (rank + 1) ** exponent for rank in range(skills)]
+  skill_ids = rng.choices(range(skills), weights=weights, k=rows)
+  levels = ["Beginner", "Intermediate", "Expert", None]
+  for row, skill_id in enumerate(skill_ids):
+    user_id = rng.randrange(users)
+    if row % 2:
+      yield user_id, skill_id, DESIRING, None
+    else:
+      yield user_id, skill_id, OFFERING, rng.choice(levels)
+
+
+def find_matches(user_id, limit=20):
+  return get_index().matches(user_id, limit=limit, exclude=blocked_user_ids(user_id))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 18:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('userSkills', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userskill',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -21,9 +21,30 @@ class UserSkill(models.Model):
     skill_type = models.CharField(max_length=10, choices=SKILL_TYPE_CHOICES)
     proficiency_level = models.CharField(max_length=12, choices=PROFICIENCY_LEVEL_CHOICES, blank=True, null=True)
     details = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
       unique_together = ('user', 'skill', 'skill_type')
 
     def __str__(self):
-      return f"{self.user.username} - {self.skill.skill_name} ({self.skill_type})"
\ No newline at end of file
+      return f"{self.user.username} - {self.skill.skill_name} ({self.skill_type})"
+
+class MatchSuggestion(models.Model):
+    """
+    Precomputed "suggested swaps": each user's top-K reciprocal partners by
+    proficiency-weighted score, rewritten by `compute_match_suggestions`
+    (see suggestions.py) and served as is.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='match_suggestions')
+    suggested_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    score = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+      constraints = [
+        models.UniqueConstraint(fields=["user", "rank"], name="unique_match_suggestion_rank"),
+      ]
+
+    def __str__(self):
+      return f"{self.user_id} -> {self.suggested_user_id} ({self.score})"
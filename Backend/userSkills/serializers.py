@@ -1,5 +1,8 @@
+from django.db import transaction
 from rest_framework import serializers
+from accounts import privacy
 from userSkills.models import UserSkill
+from userSkills import matching
 from skills.models import Skill
 
 
@@ -19,47 +22,75 @@ class AddUserSkillSerializer(serializers.Serializer):
     """
     Create or update UserSkill instances for offerings and desires.
     Automatically creates a Skill if it doesn't exist.
+
+    Runs as one transaction whose queries do not grow with the number of
+    skills: one IN lookup of the skill names, one insert of the missing
+    skills, one upsert of the UserSkills and one read back.
     """
     user = self.context['request'].user
-    created_skills = []
 
-    def add_skills(skill_list, skill_type):
-      for skill_data in skill_list:
+    # (skill_name, skill_type) -> submitted data; a repeated skill keeps its last details
+    rows = {}
+    for skill_type, key in (('offering', 'offerings'), ('desiring', 'desires')):
+      for skill_data in validated_data.get(key, []):
         skill_name = skill_data.get('skill_name')
-        
+
         # Skip if no skill name provided
         if not skill_name:
           continue
-        
-        category = skill_data.get('category', 'General')
-        description = skill_data.get('description', '')
-
-        # Get or create Skill by skill_name (not skill_id)
-        skill_obj, _ = Skill.objects.get_or_create(
-          skill_name=skill_name,
-          defaults={
-            'category': category,
-            'description': description
-          }
-        )
-
-        # Create or update UserSkill
-        skill_instance, _ = UserSkill.objects.update_or_create(
-          user=user,
-          skill=skill_obj,
-          skill_type=skill_type,
-          defaults={
-            'proficiency_level': skill_data.get('proficiency_level', ''),
-            'details': skill_data.get('details', '')
-          }
+        rows[(skill_name, skill_type)] = skill_data
+    if not rows:
+      return []
+
+    names = {skill_name for skill_name, _ in rows}
+    with transaction.atomic():
+      skill_ids = dict(Skill.objects.filter(skill_name__in=names).values_list('skill_name', 'skill_id'))
+
+      # New skills take category and description from their first mention
+      missing = {}
+      for (skill_name, _), skill_data in rows.items():
+        if skill_name not in skill_ids:
+          missing.setdefault(skill_name, skill_data)
+      if missing:
+        Skill.objects.bulk_create(
+          [
+            Skill(
+              skill_name=skill_name,
+              category=skill_data.get('category', 'General'),
+              description=skill_data.get('description', ''),
+            )
+            for skill_name, skill_data in missing.items()
+          ],
+          ignore_conflicts=True,
         )
-        created_skills.append(skill_instance)
-
-    # Add offerings and desires
-    add_skills(validated_data.get('offerings', []), 'offering')
-    add_skills(validated_data.get('desires', []), 'desiring')
-
-    return created_skills
+        skill_ids.update(Skill.objects.filter(skill_name__in=missing).values_list('skill_name', 'skill_id'))
+
+      UserSkill.objects.bulk_create(
+        [
+          UserSkill(
+            user=user,
+            skill_id=skill_ids[skill_name],
+            skill_type=skill_type,
+            proficiency_level=skill_data.get('proficiency_level', ''),
+            details=skill_data.get('details', ''),
+          )
+          for (skill_name, skill_type), skill_data in rows.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['user', 'skill', 'skill_type'],
+        update_fields=['proficiency_level', 'details', 'updated_at'],
+      )
+
+      saved = {
+        (user_skill.skill_id, user_skill.skill_type): user_skill
+        for user_skill in UserSkill.objects.filter(user=user, skill_id__in=skill_ids.values()).select_related('user', 'skill')
+      }
+
+      # bulk_create sends no signals: refresh the match index and the cached skill set here
+      transaction.on_commit(lambda: matching.refresh_user(user.user_id))
+      privacy.forget_skill_set(user.user_id)
+
+    return [saved[(skill_ids[skill_name], skill_type)] for skill_name, skill_type in rows]
 
   def to_representation(self, instance):
       """
@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from listings.models import SkillListing
+from .models import UserSkill
+from . import matching
+
+User = get_user_model()
+
+
+def refresh_on_commit(user_id):
+    transaction.on_commit(lambda: matching.refresh_user(user_id))
+
+
+@receiver(post_save, sender=UserSkill)
+@receiver(post_delete, sender=UserSkill)
+@receiver(post_save, sender=SkillListing)
+@receiver(post_delete, sender=SkillListing)
+def refresh_match_index(sender, instance, **kwargs):
+    refresh_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def refresh_match_index_for_user(sender, instance, created, update_fields=None, **kwargs):
+    """Only activity and rating matter for matching; logins only save last_login"""
+    if created or (update_fields and not {"is_active", "rating"} & set(update_fields)):
+        return
+    refresh_on_commit(instance.user_id)
@@ -0,0 +1,119 @@
+"""
+Nightly "suggested swaps": every user's top-K reciprocal partners, written
+to MatchSuggestion.
+
+Scores are proficiency-weighted sparse products over the users x skills
+incidence matrices of matching.py (O: offers, weighted by proficiency; D:
+desires). For a user ``a`` and a partner ``b``
+
+  score(a, b) = (O D^T)[b, a] + (O D^T)[a, b]
+              = what b can teach a + what a can teach b
+
+counting each skill exchanged once with the teacher's proficiency weight,
+and only when both terms are positive. The matrices are stored column-wise
+as bitsets over user slots (one per skill and weight), so a row of the
+product is a weighted bit-sliced sum of a few columns and the top-K are
+read off it by descending score without scoring users one at a time.
+Blocked pairs are excluded in both directions.
+"""
+import heapq
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from userblocks.models import UserBlock
+from .matching import add_to_counter, build_index, counted, slots_of, to_bitset
+from .models import MatchSuggestion
+
+
+# Matching levels (0 unknown, e.g. listings; 1 Beginner .. 3 Expert) -> score weight
+PROFICIENCY_WEIGHTS = {0: 1, 1: 2, 2: 3, 3: 4}
+
+BATCH_SIZE = 1000
+
+
+def weighted_offers(index):
+  """skill_id -> [(weight, bitset of users offering it at that weight)]"""
+  slots = defaultdict(lambda: defaultdict(list))
+  for user_id, offers in index.user_offers.items():
+    slot = index.slots[user_id]
+    for skill_id, level in offers.items():
+      slots[skill_id][PROFICIENCY_WEIGHTS[level]].append(slot)
+  return {
+    skill_id: [(weight, to_bitset(members)) for weight, members in by_weight.items()]
+    for skill_id, by_weight in slots.items()
+  }
+
+
+def blocked_pairs():
+  blocks = defaultdict(set)
+  for blocker, blocked in UserBlock.objects.values_list("blocker_id", "blocked_id").iterator(chunk_size=10000):
+    blocks[blocker].add(blocked)
+    blocks[blocked].add(blocker)
+  return blocks
+
+
+def top_partners(index, offers, user_id, k, exclude=()):
+  """``user_id``'s best ``k`` partners as (user_id, score), ties broken by rating."""
+  planes = []
+  teach_me = 0
+  learn_from_me = 0
+  for skill_id in index.user_desires.get(user_id, ()):
+    for weight, bitset in offers.get(skill_id, ()):
+      teach_me |= bitset
+      add_to_counter(planes, bitset, weight)
+  for skill_id, level in index.user_offers.get(user_id, {}).items():
+    bitset = index.desired_by.get(skill_id, 0)
+    learn_from_me |= bitset
+    add_to_counter(planes, bitset, PROFICIENCY_WEIGHTS[level])
+
+  excluded = 1 << index.slots[user_id]
+  for other in exclude:
+    if other in index.slots:
+      excluded |= 1 << index.slots[other]
+  candidates = teach_me & learn_from_me & ~excluded
+
+  partners = []
+  score = (1 << len(planes)) - 1
+  while candidates and score > 0 and len(partners) < k:
+    group = counted(planes, score, candidates)
+    if group:
+      candidates ^= group
+      users = heapq.nlargest(
+        k - len(partners),
+        (index.user_ids[slot] for slot in slots_of(group)),
+        key=lambda other: (index.ratings.get(other, 0.0), -other),
+      )
+      partners.extend((other, score) for other in users)
+    score -= 1
+  return partners
+
+
+def compute_suggestions(k=20, batch_size=BATCH_SIZE, dry_run=False):
+  """Recompute the whole MatchSuggestion table; returns (users scored, rows written)."""
+  index = build_index()
+  offers = weighted_offers(index)
+  blocks = blocked_pairs()
+  computed_at = timezone.now()
+
+  # Scored outside the transaction, which then only holds the swap; plain tuples keep this compact
+  suggestions = []
+  users = 0
+  for user_id in index.user_offers:
+    if user_id not in index.user_desires:
+      continue
+    users += 1
+    for rank, (other, score) in enumerate(top_partners(index, offers, user_id, k, blocks.get(user_id, ())), 1):
+      suggestions.append((user_id, other, score, rank))
+
+  if not dry_run:
+    # Readers keep seeing the previous suggestions until the new ones commit
+    with transaction.atomic():
+      MatchSuggestion.objects.all().delete()
+      for start in range(0, len(suggestions), batch_size):
+        MatchSuggestion.objects.bulk_create([
+          MatchSuggestion(user_id=user_id, suggested_user_id=other, score=score, rank=rank, computed_at=computed_at)
+          for user_id, other, score, rank in suggestions[start:start + batch_size]
+        ])
+  return users, len(suggestions)
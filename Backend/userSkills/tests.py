@@ -1,3 +1,79 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient, APIRequestFactory
 
-# Create your tests here.
+from accounts.models import User
+from skills.models import Skill
+from .models import UserSkill
+from .serializers import AddUserSkillSerializer
+
+
+class AddUserSkillSerializerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="learner@example.com", password="pw12345!", username="learner")
+        self.request = APIRequestFactory().post("/api/v1/user-skills/add-skills/")
+        self.request.user = self.user
+
+    def save(self, data):
+        serializer = AddUserSkillSerializer(data=data, context={"request": self.request})
+        serializer.is_valid(raise_exception=True)
+        return serializer.save()
+
+    def payload(self, count, prefix="Skill"):
+        return {
+            "offerings": [{"skill_name": f"{prefix} {i}", "proficiency_level": "Expert"} for i in range(count)],
+            "desires": [{"skill_name": f"{prefix} wanted {i}"} for i in range(count)],
+        }
+
+    def count_queries(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            self.save(data)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_skills(self):
+        Skill.objects.create(skill_name="Existing 0", category="General")
+        few = self.count_queries(self.payload(2, "Few"))
+        many = self.count_queries(self.payload(15, "Many"))
+        self.assertEqual(few, many)
+        # Lookup, skill insert, skill read back, upsert, read back, plus the savepoint
+        self.assertLessEqual(many, 7)
+
+        # Resubmitting only updates: no skill insert
+        self.assertLess(self.count_queries(self.payload(15, "Many")), many)
+
+    def test_upserts_existing_user_skills(self):
+        self.save({"offerings": [{"skill_name": "Guitar", "proficiency_level": "Beginner"}]})
+        skills = self.save({
+            "offerings": [{"skill_name": "Guitar", "proficiency_level": "Expert", "details": "10 years"}],
+            "desires": [{"skill_name": "Guitar"}, {"skill_name": ""}],
+        })
+
+        self.assertEqual([(s.skill.skill_name, s.skill_type) for s in skills], [("Guitar", "offering"), ("Guitar", "desiring")])
+        self.assertEqual(Skill.objects.filter(skill_name="Guitar").count(), 1)
+        offering = UserSkill.objects.get(user=self.user, skill_type="offering")
+        self.assertEqual((offering.proficiency_level, offering.details), ("Expert", "10 years"))
+        self.assertEqual(UserSkill.objects.filter(user=self.user).count(), 2)
+
+    def test_new_skills_take_category_from_first_mention(self):
+        self.save({
+            "offerings": [{"skill_name": "Pottery", "category": "Arts", "description": "Wheel throwing"}],
+            "desires": [{"skill_name": "Pottery", "category": "Crafts"}],
+        })
+        self.assertEqual(
+            Skill.objects.filter(skill_name="Pottery").values_list("category", "description").get(),
+            ("Arts", "Wheel throwing"),
+        )
+
+    def test_response_shape(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post("/api/v1/user-skills/add-skills/", self.payload(1), format="json", secure=True)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["message"], "2 skills added successfully")
+        self.assertEqual(
+            set(response.data["skills"][0]),
+            {"user_skill_id", "user_id", "skill", "skill_name", "skill_type", "proficiency_level", "details"},
+        )
+        self.assertEqual(response.data["skills"][0]["user_id"], self.user.user_id)
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import AddUserSkillView, PublicUserSkillsView
+from .views import AddUserSkillView, PublicUserSkillsView, SkillMatchesView, MatchSuggestionsView
 
 urlpatterns = [
   path('add-skills/', AddUserSkillView.as_view(), name='add-user-skills'),
+  path('matches/', SkillMatchesView.as_view(), name='skill-matches'),
+  path('suggestions/', MatchSuggestionsView.as_view(), name='match-suggestions'),
   path('<int:user_id>/', PublicUserSkillsView.as_view(), name='public-user-skills'),
 ]
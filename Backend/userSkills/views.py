@@ -4,18 +4,41 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
-from .models import UserSkill
+from django.db.models import Count, Max
+from swapo.conditional import conditional
+from swapo.singleflight import single_flight
+from accounts.privacy import visible_to_viewer
+from listings.pagination import parse_limit
+from skills.models import Skill
+from .models import UserSkill, MatchSuggestion
 from .serializers import UserSkillSerializer, AddUserSkillSerializer
+from . import matching
 
 User = get_user_model()
 
 
+def user_skills_validators(view, request, user_id):
+  """Validators of a user's public skills (ETag only): one aggregate over their UserSkill rows"""
+  if not User.objects.filter(user_id=user_id).exists():
+    return None
+  skills = UserSkill.objects.filter(user_id=user_id).aggregate(
+    count=Count("user_skill_id"),
+    last_id=Max("user_skill_id"),
+    updated_at=Max("updated_at"),
+    skill_updated_at=Max("skill__updated_at"),
+  )
+  return skills, None
+
+
 class PublicUserSkillsView(APIView):
   """
   Public endpoint: anyone can fetch a user's skills by user_id.
   """
   permission_classes = []  # No authentication required
 
+  @visible_to_viewer("public_skills")
+  @conditional(user_skills_validators)
+  @single_flight("user-skills")
   def get(self, request, user_id):
     try:
       user = User.objects.get(user_id=user_id)
@@ -33,6 +56,79 @@ class PublicUserSkillsView(APIView):
     })
     
 
+def match_user_data(user):
+  return {
+    "user_id": user.user_id,
+    "username": user.username,
+    "first_name": user.first_name,
+    "last_name": user.last_name,
+    "location": user.location,
+    "profile_picture_url": user.profile_picture_url,
+    "rating": user.rating,
+  }
+
+
+class SkillMatchesView(APIView):
+  """
+  Reciprocal matches of the current user: people offering a skill they want
+  and wanting a skill they offer, best first (see matching.py).
+  """
+  permission_classes = [IsAuthenticated]
+
+  def get(self, request):
+    found = matching.find_matches(request.user.user_id, limit=parse_limit(request.query_params.get("limit")))
+
+    user_ids = [match.user_id for match in found]
+    users = User.objects.in_bulk(user_ids)
+    skill_ids = {skill_id for match in found for skill_id in (*match.they_offer, *match.they_want)}
+    skill_names = dict(Skill.objects.filter(skill_id__in=skill_ids).values_list("skill_id", "skill_name"))
+
+    results = []
+    for match in found:
+      user = users.get(match.user_id)
+      if user is None:
+        continue
+      results.append({
+        **match_user_data(user),
+        "overlap": match.overlap,
+        "they_offer": [
+          {"skill": skill_id, "skill_name": skill_names.get(skill_id), "proficiency_level": matching.LEVEL_NAMES.get(level)}
+          for skill_id, level in match.they_offer.items()
+        ],
+        "they_want": [
+          {"skill": skill_id, "skill_name": skill_names.get(skill_id)}
+          for skill_id in match.they_want
+        ],
+      })
+    return Response({"results": results})
+
+
+class MatchSuggestionsView(APIView):
+  """
+  The current user's precomputed suggested swaps (suggestions.py), best
+  first. Users blocked or deactivated since the last run are left out.
+  """
+  permission_classes = [IsAuthenticated]
+
+  def get(self, request):
+    suggestions = (
+      MatchSuggestion.objects.filter(user=request.user, suggested_user__is_active=True)
+      .exclude(suggested_user_id__in=matching.blocked_user_ids(request.user.user_id))
+      .select_related("suggested_user")
+      .order_by("rank")
+    )
+    return Response({
+      "results": [
+        {
+          **match_user_data(suggestion.suggested_user),
+          "score": suggestion.score,
+          "computed_at": suggestion.computed_at,
+        }
+        for suggestion in suggestions
+      ]
+    })
+
+
 class UserSkillSerializer(serializers.ModelSerializer):
   user_id = serializers.IntegerField(source='user.user_id', read_only=True)
   skill_name = serializers.CharField(source='skill.skill_name', read_only=True)
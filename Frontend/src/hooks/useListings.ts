@@ -0,0 +1,40 @@
+// src/hooks/useListings.ts
+import { useInfiniteQuery } from '@tanstack/react-query';
+import axiosInstance from '@/utils/axiosInstance';
+import type { Listing } from '@/pages/dashboard/Listing';
+
+interface ListingPage {
+  results: Listing[];
+  // Feed: keyset cursor; search: next page number
+  next: string | number | null;
+}
+
+// The public feed, newest first, or the ranked search results when `search`
+// is given. Both are paged by the server; fetchMore follows `next`.
+export const useListings = (search: string) => {
+  const query = useInfiniteQuery({
+    queryKey: ['listings', search],
+    queryFn: async ({ pageParam }): Promise<ListingPage> => {
+      if (search) {
+        const res = await axiosInstance.get('/listings/search/', {
+          params: { q: search, page: pageParam ?? 1 },
+        });
+        return res.data;
+      }
+      const res = await axiosInstance.get('/listings/', {
+        params: pageParam ? { cursor: pageParam } : undefined,
+      });
+      return res.data;
+    },
+    initialPageParam: null as string | number | null,
+    getNextPageParam: (lastPage) => lastPage.next ?? undefined,
+    select: (data) => data.pages.flatMap((page) => page.results),
+  });
+
+  return {
+    ...query,
+    hasMore: query.hasNextPage,
+    fetchMore: query.fetchNextPage,
+    isFetchingMore: query.isFetchingNextPage,
+  };
+};
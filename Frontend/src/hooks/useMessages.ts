@@ -1,16 +1,35 @@
 // src/hooks/useMessages.ts
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import {
+  useInfiniteQuery,
+  useMutation,
+  useQueryClient,
+} from '@tanstack/react-query';
 import axiosInstance from '@/utils/axiosInstance';
 
+interface MessagePage {
+  results: any[];
+  previous: string | null;
+  next: string | null;
+}
+
 export const useMessages = (userId?: string | number | null) => {
   const queryClient = useQueryClient();
 
-  const messagesQuery = useQuery({
+  // Pages go backwards in time: the first is the latest messages, each
+  // following one is fetched with the `previous` cursor of the one before.
+  const messagesQuery = useInfiniteQuery({
     queryKey: ['messages', userId],
-    queryFn: async () => {
-      const res = await axiosInstance.get(`/messages/conversation/${userId}/`);
+    queryFn: async ({ pageParam }): Promise<MessagePage> => {
+      const res = await axiosInstance.get(`/messages/conversation/${userId}/`, {
+        params: pageParam ? { before: pageParam } : undefined,
+      });
       return res.data;
     },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.previous,
+    select: (data) =>
+      // Oldest page first; each page is already in chronological order
+      [...data.pages].reverse().flatMap((page) => page.results),
     enabled: !!userId,
   });
 
@@ -28,5 +47,11 @@ export const useMessages = (userId?: string | number | null) => {
     },
   });
 
-  return { ...messagesQuery, sendMessage };
+  return {
+    ...messagesQuery,
+    hasOlder: messagesQuery.hasNextPage,
+    fetchOlder: messagesQuery.fetchNextPage,
+    isFetchingOlder: messagesQuery.isFetchingNextPage,
+    sendMessage,
+  };
 };
@@ -0,0 +1,87 @@
+// src/hooks/useNotificationStream.ts
+import { useEffect, useSyncExternalStore } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import axiosInstance from '@/utils/axiosInstance';
+
+const MAX_RETRY_DELAY = 60_000;
+
+// Shared connection state, so hooks can fall back to polling while the stream is down
+let connected = false;
+const listeners = new Set<() => void>();
+
+const setConnected = (value: boolean) => {
+  if (connected !== value) {
+    connected = value;
+    listeners.forEach((listener) => listener());
+  }
+};
+
+export const useStreamConnected = () =>
+  useSyncExternalStore(
+    (listener) => {
+      listeners.add(listener);
+      return () => listeners.delete(listener);
+    },
+    () => connected,
+  );
+
+// Opens the push stream (mount once, in the dashboard layout). Tickets are
+// one-use, so every (re)connect fetches a new one instead of letting
+// EventSource retry the same URL.
+export const useNotificationStream = () => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    let source: EventSource | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let retryDelay = 1000;
+    let stopped = false;
+
+    const retry = () => {
+      setConnected(false);
+      if (stopped) return;
+      retryTimer = setTimeout(connect, retryDelay);
+      retryDelay = Math.min(retryDelay * 2, MAX_RETRY_DELAY);
+    };
+
+    const connect = async () => {
+      try {
+        const res = await axiosInstance.post('/notifications/stream_ticket/');
+        if (stopped) return;
+        source = new EventSource(
+          `${axiosInstance.defaults.baseURL}/notifications/stream/?ticket=${encodeURIComponent(res.data.ticket)}`,
+        );
+      } catch {
+        retry();
+        return;
+      }
+
+      source.onopen = () => {
+        retryDelay = 1000;
+        setConnected(true);
+        // Catch up on anything missed while disconnected
+        queryClient.invalidateQueries({ queryKey: ['notifications'] });
+      };
+      source.addEventListener('notification', () => {
+        queryClient.invalidateQueries({ queryKey: ['notifications'] });
+      });
+      source.addEventListener('message', () => {
+        queryClient.invalidateQueries({ queryKey: ['messages'] });
+        queryClient.invalidateQueries({ queryKey: ['conversations'] });
+      });
+      source.onerror = () => {
+        source?.close();
+        source = null;
+        retry();
+      };
+    };
+
+    connect();
+    return () => {
+      stopped = true;
+      clearTimeout(retryTimer);
+      source?.close();
+      setConnected(false);
+    };
+  }, [queryClient]);
+};
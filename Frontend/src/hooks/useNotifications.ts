@@ -1,5 +1,9 @@
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import axios from '@/utils/axiosInstance';
+import { useStreamConnected } from '@/hooks/useNotificationStream';
+
+// Unread count polling, only while the push stream is unavailable
+const FALLBACK_POLL_INTERVAL = 30_000;
 
 interface Notification {
   notification_id: number;
@@ -36,13 +40,14 @@ interface Notification {
 
 export const useNotifications = () => {
   const queryClient = useQueryClient();
+  const streaming = useStreamConnected();
 
   // Fetch all notifications
   const { data, isLoading, error } = useQuery({
     queryKey: ['notifications'],
     queryFn: async () => {
       const response = await axios.get('/notifications/');
-      return response.data as Notification[];
+      return response.data.results as Notification[];
     },
   });
 
@@ -53,6 +58,9 @@ export const useNotifications = () => {
       const response = await axios.get('/notifications/unread_count/');
       return response.data.unread_count as number;
     },
+    // The stream invalidates this query when a notification arrives
+    refetchInterval: streaming ? false : FALLBACK_POLL_INTERVAL,
+    refetchOnWindowFocus: !streaming,
   });
 
   // Mark all as read mutation
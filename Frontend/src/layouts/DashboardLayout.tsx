@@ -7,8 +7,10 @@ import {
 } from 'lucide-react';
 import { Outlet, NavLink } from 'react-router-dom';
 import { useMessageList } from '@/hooks/useMessageList';
+import { useNotificationStream } from '@/hooks/useNotificationStream';
 
 const DashboardLayout = () => {
+  useNotificationStream();
   const { data: chatList = [] } = useMessageList();
 
   // Check if there are any unread messages
@@ -21,6 +21,9 @@ const ChatWindow = ({
     data: messages = [],
     sendMessage,
     isLoading: chatLoading,
+    hasOlder,
+    fetchOlder,
+    isFetchingOlder,
   } = useMessages(selectedChatId);
   const { data: chatList = [] } = useMessageList();
   const navigate = useNavigate();
@@ -52,9 +55,11 @@ const ChatWindow = ({
 
   useEnterKey(handleSend);
 
+  // Only follow new messages; loading older ones keeps the position
+  const latestMessageId = messages[messages.length - 1]?.message_id;
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages]);
+  }, [latestMessageId]);
 
   if (chatLoading) return <p className="p-4 text-center">Loading chat...</p>;
 
@@ -91,6 +96,16 @@ const ChatWindow = ({
 
       {/* Messages */}
       <div className="hide-scrollbar-vertical flex flex-1 flex-col space-y-3 overflow-y-auto px-4 py-4">
+        {hasOlder && (
+          <button
+            type="button"
+            className="mx-auto text-sm text-gray-500 hover:text-gray-700 disabled:opacity-50 dark:text-gray-400 dark:hover:text-gray-200"
+            onClick={() => fetchOlder()}
+            disabled={isFetchingOlder}
+          >
+            {isFetchingOlder ? 'Loading...' : 'Load older messages'}
+          </button>
+        )}
         {messages.map((msg: any, idx: number) => {
           // Get current user ID from profile
           const currentUserId =
@@ -110,7 +125,10 @@ const ChatWindow = ({
           const receiverDetails = msg.receiver_details;
 
           return (
-            <div key={idx} className="flex flex-col space-y-1">
+            <div
+              key={msg.message_id ?? idx}
+              className="flex flex-col space-y-1"
+            >
               {/* Message bubble - always aligned right for current user */}
               <div
                 className={`flex items-end ${
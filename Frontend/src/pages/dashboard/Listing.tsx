@@ -4,8 +4,9 @@ import clsx from 'clsx';
 import Button from '@/components/ui/Button';
 import { useNavigate } from 'react-router-dom';
 import axios from '@/utils/axiosInstance';
+import { useListings } from '@/hooks/useListings';
 
-const API_BASE_URL = import.meta.env.VITE_BASE_URL;
+const SEARCH_DEBOUNCE_MS = 300;
 
 export interface Listing {
   listing_id: number;
@@ -45,8 +46,14 @@ const ListingPage = () => {
   const [activeCategory, setActiveCategory] = useState('All');
   const [isFilterOpen, setIsFilterOpen] = useState(false);
   const [search, setSearch] = useState('');
-  const [listings, setListings] = useState<Listing[]>([]);
-  const [loadingListing, setLoadingListing] = useState(false);
+  const [searchTerm, setSearchTerm] = useState('');
+  const {
+    data: listings = [],
+    isLoading: loadingListing,
+    hasMore,
+    fetchMore,
+    isFetchingMore,
+  } = useListings(searchTerm);
 
   const [_loadingUserProfile, setLoadingUserProfile] = useState(true);
   const [profile, setProfile] = useState<any>(null);
@@ -65,22 +72,14 @@ const ListingPage = () => {
     fetchProfile();
   }, []);
 
+  // Searching goes to the server, so listings beyond the loaded pages are found too
   useEffect(() => {
-    const fetchListings = async () => {
-      setLoadingListing(true);
-      try {
-        const res = await fetch(`${API_BASE_URL}/listings/`);
-        if (!res.ok) throw new Error('Failed to fetch listings');
-        const data: Listing[] = await res.json();
-        setListings(data);
-      } catch (err) {
-        console.error(err);
-      } finally {
-        setLoadingListing(false);
-      }
-    };
-    fetchListings();
-  }, []);
+    const timer = setTimeout(
+      () => setSearchTerm(search.trim()),
+      SEARCH_DEBOUNCE_MS,
+    );
+    return () => clearTimeout(timer);
+  }, [search]);
 
   // Map API data to component format
   const mappedListings = listings.map((l) => ({
@@ -95,15 +94,10 @@ const ListingPage = () => {
       'https://img.icons8.com/office/40/person-female.png',
   }));
 
+  // Categories are derived from skill names, so they filter the loaded pages
   const filteredListings = mappedListings.filter((l) => {
     const listingCategory = getCategory(l.skill_offered_name);
-    const matchesCategory =
-      activeCategory === 'All' || listingCategory === activeCategory;
-    const matchesSearch =
-      l.name.toLowerCase().includes(search.toLowerCase()) ||
-      l.skill_offered_name.toLowerCase().includes(search.toLowerCase()) ||
-      l.skill_desired_name.toLowerCase().includes(search.toLowerCase());
-    return matchesCategory && matchesSearch;
+    return activeCategory === 'All' || listingCategory === activeCategory;
   });
   // /console.log('listings', listings);
 
@@ -260,11 +254,22 @@ const ListingPage = () => {
             );
           })}
 
-          {filteredListings.length === 0 && (
+          {filteredListings.length === 0 && !hasMore && (
             <p className="col-span-full mt-10 text-center text-gray-500">
               No results found.
             </p>
           )}
+
+          {hasMore && (
+            <button
+              type="button"
+              className="mx-auto text-sm text-gray-500 hover:text-gray-700 disabled:opacity-50 dark:text-gray-400 dark:hover:text-gray-200"
+              onClick={() => fetchMore()}
+              disabled={isFetchingMore}
+            >
+              {isFetchingMore ? 'Loading...' : 'Load more listings'}
+            </button>
+          )}
         </div>
       )}
 